@@ -0,0 +1,270 @@
+"""
+Vectorized return / risk analytics over gold-table close prices.
+
+Everything works on a (dates x tickers) price matrix with NaN for missing
+observations, so a request for any ticker set and window is a handful of
+NumPy array operations rather than per-ticker Python loops.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+TRADING_DAYS = 252
+
+ALL_METRICS = ("summary", "correlation", "volatility", "beta", "drawdown", "distribution")
+
+
+def _to_list(values) -> list:
+    """Array -> JSON-safe list (NaN/Inf become None)."""
+    arr = np.asarray(values, dtype=float)
+    out = arr.astype(object)
+    out[~np.isfinite(arr)] = None
+    return out.tolist()
+
+
+def _column_moments(x: np.ndarray):
+    """
+    NaN-aware per-column (count, mean, deviations) without np.nan* functions,
+    which warn on all-NaN columns. Deviations are 0 where x is missing.
+    """
+    valid = np.isfinite(x)
+    counts = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, x, 0.0).sum(axis=0) / counts
+    deviations = np.where(valid, x - mean, 0.0)
+    return counts, mean, deviations
+
+
+# ===========================
+# BUILDING BLOCKS
+# ===========================
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    """(T, N) prices -> (T-1, N) simple returns; NaN where a price is missing."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = prices[1:] / prices[:-1] - 1.0
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+
+def equal_weight_index(returns: np.ndarray) -> np.ndarray:
+    """Daily return of an equal-weight, daily-rebalanced basket of the columns."""
+    valid = np.isfinite(returns)
+    counts = valid.sum(axis=1)
+    sums = np.where(valid, returns, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def correlation_matrix(returns: np.ndarray) -> np.ndarray:
+    """
+    Pairwise-complete correlation of returns: each pair uses the dates where
+    both tickers traded, so a ticker with no data only blanks its own row
+    and column. Pairs with fewer than two shared dates are NaN.
+    """
+    valid = np.isfinite(returns).astype(float)
+    x = np.where(valid > 0, returns, 0.0)
+    # Sums over each pair's shared dates, as (N, N) matrices
+    n = valid.T @ valid
+    sum_x = x.T @ valid          # [i, j]: sum of x_i where j also traded
+    sum_y = sum_x.T
+    sum_xy = x.T @ x
+    sum_xx = (x ** 2).T @ valid
+    sum_yy = sum_xx.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sum_xy - sum_x * sum_y / n
+        var_x = sum_xx - sum_x ** 2 / n
+        var_y = sum_yy - sum_y ** 2 / n
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[(n < 2) | ~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def rolling_volatility(
+    returns: np.ndarray,
+    window: int,
+    periods_per_year: int = TRADING_DAYS,
+) -> np.ndarray:
+    """
+    Annualized rolling standard deviation of returns. Row i covers returns
+    i .. i+window-1; windows with fewer than two observations are NaN.
+    """
+    if returns.shape[0] < window:
+        return np.empty((0, returns.shape[1]))
+    windows = np.lib.stride_tricks.sliding_window_view(returns, window, axis=0)
+    valid = np.isfinite(windows)
+    counts = valid.sum(axis=-1)
+    filled = np.where(valid, windows, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=-1) / counts
+        sq_dev = np.where(valid, (windows - mean[..., None]) ** 2, 0.0).sum(axis=-1)
+        var = np.where(counts > 1, sq_dev / (counts - 1), np.nan)
+    return np.sqrt(var * periods_per_year)
+
+
+def beta(returns: np.ndarray, market: np.ndarray) -> np.ndarray:
+    """Per-column beta against a market return series, over shared dates."""
+    valid = np.isfinite(returns) & np.isfinite(market)[:, None]
+    counts, _, r_dev = _column_moments(np.where(valid, returns, np.nan))
+    _, _, m_dev = _column_moments(np.where(valid, market[:, None], np.nan))
+    cov = (r_dev * m_dev).sum(axis=0)
+    var = (m_dev ** 2).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where((counts > 1) & (var > 0), cov / var, np.nan)
+
+
+def drawdowns(prices: np.ndarray) -> np.ndarray:
+    """Drawdown from the running peak (0 at a new high, negative below it)."""
+    peaks = np.fmax.accumulate(prices, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return prices / peaks - 1.0
+
+
+# ===========================
+# REPORT
+# ===========================
+
+def _summary(prices, returns, tickers) -> Dict[str, dict]:
+    # First / last observed price per column (columns may start late or end early)
+    has_price = np.isfinite(prices)
+    cols = np.arange(prices.shape[1])
+    first = prices[np.argmax(has_price, axis=0), cols]
+    last = prices[prices.shape[0] - 1 - np.argmax(has_price[::-1], axis=0), cols]
+
+    periods, _, deviations = _column_moments(returns)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        total = last / first - 1.0
+        annual_return = (1.0 + total) ** (TRADING_DAYS / periods) - 1.0
+        annual_vol = np.sqrt((deviations ** 2).sum(axis=0) / (periods - 1) * TRADING_DAYS)
+    annual_return[periods == 0] = np.nan
+    annual_vol[periods < 2] = np.nan
+
+    columns = {
+        "last_close": _to_list(last),
+        "total_return": _to_list(total),
+        "annualized_return": _to_list(annual_return),
+        "annualized_volatility": _to_list(annual_vol),
+    }
+    return {t: {k: v[j] for k, v in columns.items()} for j, t in enumerate(tickers)}
+
+
+def _drawdown_report(prices, dates, tickers) -> Dict[str, dict]:
+    dd = drawdowns(prices)
+    report = {}
+    for j, ticker in enumerate(tickers):
+        col = dd[:, j]
+        finite = np.isfinite(col)
+        if not finite.any():
+            report[ticker] = {"max_drawdown": None, "max_drawdown_date": None, "current_drawdown": None}
+            continue
+        trough = int(np.nanargmin(col))
+        report[ticker] = {
+            "max_drawdown": float(col[trough]),
+            "max_drawdown_date": dates[trough],
+            "current_drawdown": float(col[finite][-1]),
+        }
+    return report
+
+
+def _distribution_report(returns, tickers, bins: int) -> dict:
+    finite = returns[np.isfinite(returns)]
+    if finite.size == 0:
+        return {"bin_edges": [], "tickers": {t: None for t in tickers}}
+    edges = np.histogram_bin_edges(finite, bins=bins)
+
+    n, mean, dev = _column_moments(returns)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.sqrt((dev ** 2).sum(axis=0) / (n - 1))
+        skew = (dev ** 3).sum(axis=0) / n / std ** 3
+        kurt = (dev ** 4).sum(axis=0) / n / std ** 4 - 3.0
+    pct_levels = (5, 25, 50, 75, 95)
+
+    out = {}
+    for j, ticker in enumerate(tickers):
+        col = returns[:, j]
+        col = col[np.isfinite(col)]
+        pcts = np.percentile(col, pct_levels) if col.size else np.full(len(pct_levels), np.nan)
+        counts, _ = np.histogram(col, bins=edges)
+        out[ticker] = {
+            "mean": _to_list(mean[j]),
+            "std": _to_list(std[j]),
+            "skew": _to_list(skew[j]),
+            "excess_kurtosis": _to_list(kurt[j]),
+            "percentiles": dict(zip((f"p{p}" for p in pct_levels), _to_list(pcts))),
+            "histogram": counts.tolist(),
+        }
+    return {"bin_edges": _to_list(edges), "tickers": out}
+
+
+def compute_analytics(
+    dates: Sequence[str],
+    tickers: Sequence[str],
+    prices: np.ndarray,
+    index_prices: Optional[np.ndarray] = None,
+    window: int = 20,
+    metrics: Sequence[str] = ALL_METRICS,
+    bins: int = 20,
+) -> dict:
+    """
+    Build the analytics report for a (len(dates) x len(tickers)) close
+    price matrix. `index_prices` holds the constituents of the benchmark
+    index (same dates) used for beta.
+    """
+    tickers = list(tickers)
+    dates = list(dates)
+    prices = np.asarray(prices, dtype=float)
+    returns = simple_returns(prices)
+    return_dates = dates[1:]
+    report = {
+        "tickers": tickers,
+        "start_date": dates[0] if dates else None,
+        "end_date": dates[-1] if dates else None,
+        "observations": len(dates),
+    }
+
+    if "summary" in metrics:
+        report["summary"] = _summary(prices, returns, tickers)
+
+    if "correlation" in metrics:
+        report["correlation"] = {
+            "tickers": tickers,
+            "matrix": _to_list(correlation_matrix(returns)),
+        }
+
+    if "volatility" in metrics:
+        vol = rolling_volatility(returns, window)
+        report["rolling_volatility"] = {
+            "window": window,
+            "dates": return_dates[window - 1:],
+            "series": {t: _to_list(vol[:, j]) for j, t in enumerate(tickers)},
+        }
+
+    if "beta" in metrics:
+        if index_prices is None:
+            index_prices = prices
+        index_returns = equal_weight_index(simple_returns(np.asarray(index_prices, dtype=float)))
+        report["beta"] = dict(zip(tickers, _to_list(beta(returns, index_returns))))
+
+    if "drawdown" in metrics:
+        report["drawdown"] = _drawdown_report(prices, dates, tickers)
+
+    if "distribution" in metrics:
+        report["return_distribution"] = _distribution_report(returns, tickers, bins)
+
+    return report
+
+
+def price_matrix(df, tickers: List[str]):
+    """
+    Pivot long (ticker, trade_date, close) rows into (dates, matrix) with
+    one column per ticker, in the order given. Missing tickers are NaN.
+    """
+    wide = (
+        df.pivot_table(index="trade_date", columns="ticker", values="close", aggfunc="last")
+        .sort_index()
+        .reindex(columns=tickers)
+    )
+    dates = [d.isoformat() if hasattr(d, "isoformat") else str(d) for d in wide.index]
+    return dates, wide.to_numpy(dtype=float, na_value=np.nan)
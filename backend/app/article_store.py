@@ -0,0 +1,293 @@
+"""
+Local SQLite store for news articles.
+
+Articles coming out of the news pipeline are stored once and tagged with
+every ticker they matched. Duplicates are recognized by normalized URL, or
+by title when the same headline was published within
+TITLE_DEDUP_WINDOW_HOURS (syndicated copies); a recurring headline on a
+later date is a new article. Per-ticker fetch state records the newest
+`publishedAt` seen, so upstream fetches only ask NewsAPI for the delta. The news endpoints read from here,
+with keyset pagination and optional full-text search (FTS5 when available).
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .news_pipeline import normalize_url, title_hash
+
+
+# Bumped when the schema changes incompatibly. The store is a cache of
+# NewsAPI, so an outdated file is simply dropped and refetched.
+SCHEMA_VERSION = 2
+
+# Same headline within this window = the same story from another outlet
+TITLE_DEDUP_WINDOW_HOURS = 24
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url_key TEXT UNIQUE,
+    title_hash TEXT,
+    url TEXT,
+    title TEXT NOT NULL,
+    description TEXT,
+    source TEXT,
+    published_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_articles_title_hash ON articles (title_hash);
+
+CREATE TABLE IF NOT EXISTS article_tickers (
+    article_id INTEGER NOT NULL REFERENCES articles(id),
+    ticker TEXT NOT NULL,
+    relevance INTEGER NOT NULL DEFAULT 0,
+    published_at TEXT,
+    PRIMARY KEY (ticker, article_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_article_tickers_recent
+    ON article_tickers (ticker, published_at DESC, article_id DESC);
+
+CREATE TABLE IF NOT EXISTS fetch_state (
+    ticker TEXT PRIMARY KEY,
+    watermark TEXT,
+    last_fetch_at REAL
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, description, content='articles', content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, description)
+    VALUES (new.id, new.title, new.description);
+END;
+"""
+
+
+DROP_SCHEMA = """
+DROP TRIGGER IF EXISTS articles_fts_insert;
+DROP TABLE IF EXISTS articles_fts;
+DROP TABLE IF EXISTS article_tickers;
+DROP TABLE IF EXISTS fetch_state;
+DROP TABLE IF EXISTS articles;
+"""
+
+
+def encode_cursor(published_at: Optional[str], article_id: int) -> str:
+    return f"{published_at or ''}|{article_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    published_at, _, article_id = cursor.rpartition("|")
+    try:
+        return published_at, int(article_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+
+
+def _fts_query(text: str) -> str:
+    # Quote every term so user input is never parsed as FTS syntax
+    return " ".join('"' + t.replace('"', '""') + '"' for t in text.split())
+
+
+class ArticleStore:
+    """
+    Thread-safe wrapper around one SQLite connection. Every public method
+    takes the store lock, so it can be shared by request handlers and the
+    background refresher.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._conn.executescript(DROP_SCHEMA)
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.executescript(SCHEMA)
+            try:
+                self._conn.executescript(FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: fall back to LIKE matching
+                self.has_fts = False
+
+    # ---------- writes ----------
+
+    def _find_existing(self, url_key, t_hash, published_at) -> Optional[sqlite3.Row]:
+        if url_key:
+            row = self._conn.execute(
+                "SELECT id, published_at FROM articles WHERE url_key = ?", (url_key,)
+            ).fetchone()
+            if row is not None:
+                return row
+        if not t_hash:
+            return None
+        if published_at is None:
+            # Nothing to bound the match by: only undated rows with this title
+            return self._conn.execute(
+                "SELECT id, published_at FROM articles WHERE title_hash = ? AND published_at IS NULL",
+                (t_hash,),
+            ).fetchone()
+        return self._conn.execute(
+            """
+            SELECT id, published_at FROM articles
+            WHERE title_hash = ?
+              AND abs(julianday(published_at) - julianday(?)) * 24 <= ?
+            ORDER BY id DESC
+            """,
+            (t_hash, published_at, TITLE_DEDUP_WINDOW_HOURS),
+        ).fetchone()
+
+    def add_articles(self, matches: Dict[str, List[dict]]) -> int:
+        """
+        Store pipeline output ({ticker: [article, ...]}). Articles already
+        present (same normalized URL, or same title within
+        TITLE_DEDUP_WINDOW_HOURS) are only re-tagged.
+        Returns the number of new articles.
+        """
+        added = 0
+        with self._lock, self._conn:
+            for ticker, articles in matches.items():
+                for a in articles:
+                    url_key = normalize_url(a.get("url"))
+                    t_hash = title_hash(a.get("title"))
+                    published_at = a.get("published_at")
+                    row = self._find_existing(url_key, t_hash, published_at)
+                    if row is not None:
+                        article_id, published_at = row["id"], row["published_at"]
+                    else:
+                        cur = self._conn.execute(
+                            """
+                            INSERT INTO articles
+                              (url_key, title_hash, url, title, description, source, published_at)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)
+                            """,
+                            (
+                                url_key,
+                                t_hash,
+                                a.get("url"),
+                                a.get("title") or "",
+                                a.get("description"),
+                                a.get("source"),
+                                published_at,
+                            ),
+                        )
+                        added += 1
+                        article_id = cur.lastrowid
+
+                    self._conn.execute(
+                        """
+                        INSERT INTO article_tickers (article_id, ticker, relevance, published_at)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT (ticker, article_id)
+                        DO UPDATE SET relevance = max(relevance, excluded.relevance)
+                        """,
+                        (article_id, ticker, a.get("relevance") or 0, published_at),
+                    )
+        return added
+
+    def mark_fetched(self, ticker: str, watermark: Optional[str]) -> None:
+        """Record a completed upstream fetch; the watermark only moves forward."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO fetch_state (ticker, watermark, last_fetch_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT (ticker) DO UPDATE SET
+                  watermark = CASE
+                    WHEN fetch_state.watermark IS NULL THEN excluded.watermark
+                    WHEN excluded.watermark IS NULL THEN fetch_state.watermark
+                    ELSE max(fetch_state.watermark, excluded.watermark)
+                  END,
+                  last_fetch_at = excluded.last_fetch_at
+                """,
+                (ticker, watermark, time.time()),
+            )
+
+    # ---------- reads ----------
+
+    def fetch_state(self, ticker: str) -> Tuple[Optional[str], Optional[float]]:
+        """Return (watermark, last_fetch_at) for a ticker, or (None, None)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, last_fetch_at FROM fetch_state WHERE ticker = ?",
+                (ticker,),
+            ).fetchone()
+        if row is None:
+            return None, None
+        return row["watermark"], row["last_fetch_at"]
+
+    def query(
+        self,
+        ticker: str,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Newest-first page of a ticker's articles, optionally restricted by a
+        full-text search. Returns (articles, next_cursor); next_cursor is None
+        on the last page.
+        """
+        sql = [
+            """
+            SELECT a.id, a.title, a.description, a.source, a.url,
+                   t.published_at, t.relevance
+            FROM article_tickers t
+            JOIN articles a ON a.id = t.article_id
+            WHERE t.ticker = ?
+            """
+        ]
+        params: list = [ticker]
+
+        if cursor:
+            published_at, article_id = decode_cursor(cursor)
+            sql.append(
+                "AND (IFNULL(t.published_at, '') < ? "
+                "OR (IFNULL(t.published_at, '') = ? AND a.id < ?))"
+            )
+            params.extend([published_at, published_at, article_id])
+
+        if search and search.strip():
+            if self.has_fts:
+                sql.append(
+                    "AND a.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)"
+                )
+                params.append(_fts_query(search))
+            else:
+                for term in search.split():
+                    sql.append("AND (a.title LIKE ? OR a.description LIKE ?)")
+                    params.extend([f"%{term}%", f"%{term}%"])
+
+        sql.append("ORDER BY IFNULL(t.published_at, '') DESC, a.id DESC LIMIT ?")
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute("\n".join(sql), params).fetchall()
+
+        articles = [
+            {
+                "title": r["title"],
+                "description": r["description"],
+                "source": r["source"],
+                "url": r["url"],
+                "published_at": r["published_at"],
+                "relevance": r["relevance"],
+            }
+            for r in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last["published_at"], last["id"])
+        return articles, next_cursor
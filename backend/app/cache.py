@@ -0,0 +1,244 @@
+"""
+Cache abstraction shared by query results, LLM answers and news.
+
+Two backends with the same interface:
+  - MemoryCache: per-process LRU with TTLs (default, no dependencies)
+  - RedisCache: shared across worker processes / instances via the Redis
+    protocol (needs a reachable server; the `redis` client package is in
+    requirements.txt but only imported when this backend is selected)
+
+The memory backend holds any object. The Redis backend serializes values as
+JSON, or as Parquet (via pyarrow) for pandas DataFrames, never pickle:
+whoever can write to a shared Redis must not be able to run code in the
+workers reading it.
+The cache is an optimization only: backend errors (including values that
+cannot be serialized) are logged and treated as misses.
+"""
+
+import hashlib
+import io
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+_MISSING = object()
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    """Stable key from a namespace and JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+    return f"{namespace}:{digest}"
+
+
+class Cache:
+    """Base class: subclasses implement _get / _set / _add / _delete."""
+
+    backend = "base"
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- backend hooks ----------
+
+    def _get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def _add(self, key: str, value: Any, ttl: float) -> bool:
+        raise NotImplementedError
+
+    def _delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    # ---------- public API ----------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            value = self._get(key)
+        except Exception as e:
+            print(f"Cache get failed ({self.backend}): {e}")
+            value = _MISSING
+        with self._stats_lock:
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return default if value is _MISSING else value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            self._set(key, value, ttl)
+        except Exception as e:
+            print(f"Cache set failed ({self.backend}): {e}")
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        """
+        Set only if the key does not exist. Returns True if this call set it,
+        which makes it usable as a short-lived cross-worker lock / lease.
+        """
+        try:
+            return self._add(key, value, ttl)
+        except Exception as e:
+            print(f"Cache add failed ({self.backend}): {e}")
+            return True
+
+    def delete(self, key: str) -> None:
+        try:
+            self._delete(key)
+        except Exception as e:
+            print(f"Cache delete failed ({self.backend}): {e}")
+
+    def get_or_compute(self, key: str, ttl: float, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, or compute, store and return it."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "backend": self.backend,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else None,
+        }
+
+
+class MemoryCache(Cache):
+    """Thread-safe in-process LRU cache with per-entry TTLs."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 1024):
+        super().__init__()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def _store(self, key, value, ttl):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def _set(self, key, value, ttl):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _add(self, key, value, ttl):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def _delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+def _encode(value: Any) -> bytes:
+    """Tagged bytes for Redis: b"P" + Parquet for DataFrames, b"J" + JSON otherwise."""
+    # pandas is only checked for if something already imported it
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        buf = io.BytesIO()
+        value.to_parquet(buf)
+        return b"P" + buf.getvalue()
+    return b"J" + json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(raw: bytes) -> Any:
+    tag, payload = raw[:1], raw[1:]
+    if tag == b"J":
+        return json.loads(payload)
+    if tag == b"P":
+        import pandas as pd
+
+        return pd.read_parquet(io.BytesIO(payload))
+    raise ValueError(f"Unknown cache payload tag: {tag!r}")
+
+
+class RedisCache(Cache):
+    """
+    Cache backed by a Redis-protocol server, shared by every worker that
+    points at it. `client` can be any redis-py compatible client (e.g. a
+    fakeredis instance in tests); otherwise one is built from `url`.
+    Values must be JSON-serializable or DataFrames (see _encode).
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "faang", client=None):
+        super().__init__()
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self._client = client
+        self.prefix = prefix
+
+    def _k(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _get(self, key):
+        raw = self._client.get(self._k(key))
+        if raw is None:
+            return _MISSING
+        return _decode(raw)
+
+    def _set(self, key, value, ttl):
+        self._client.set(
+            self._k(key),
+            _encode(value),
+            px=max(1, int(ttl * 1000)),
+        )
+
+    def _add(self, key, value, ttl):
+        return bool(
+            self._client.set(
+                self._k(key),
+                _encode(value),
+                px=max(1, int(ttl * 1000)),
+                nx=True,
+            )
+        )
+
+    def _delete(self, key):
+        self._client.delete(self._k(key))
+
+
+def create_cache(backend: str = "memory", redis_url: Optional[str] = None, max_entries: int = 1024) -> Cache:
+    """Build the configured cache backend ("memory" or "redis")."""
+    backend = (backend or "memory").lower()
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries)
+    if backend == "redis":
+        return RedisCache(url=redis_url)
+    raise ValueError(f"Unknown cache backend: {backend}")
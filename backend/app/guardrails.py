@@ -0,0 +1,61 @@
+"""
+Query-cost and response-size guardrails for BigQuery-backed endpoints.
+
+Each endpoint gets a QueryBudget. Before a query runs it is dry-run to
+estimate the bytes it would scan; queries over budget are rejected without
+being executed. The real job is also submitted with maximum_bytes_billed so
+BigQuery enforces the ceiling server-side, and results are downloaded with a
+row cap so a single request can never pull an unbounded result set.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    max_bytes: int
+    max_rows: int
+
+
+class BudgetExceeded(Exception):
+    """Raised when a query would scan or return more than its budget allows."""
+
+
+def _copy_config(job_config, **overrides):
+    from google.cloud import bigquery
+
+    config = bigquery.QueryJobConfig(**overrides)
+    if job_config is not None:
+        config.query_parameters = list(job_config.query_parameters)
+    return config
+
+
+def dry_run_bytes(client, query: str, job_config=None) -> int:
+    """Bytes BigQuery would scan for the query (dry run, nothing is billed)."""
+    config = _copy_config(job_config, dry_run=True, use_query_cache=False)
+    job = client.query(query, job_config=config)
+    return int(job.total_bytes_processed or 0)
+
+
+def check_bytes(estimated_bytes: int, budget: QueryBudget) -> None:
+    if estimated_bytes > budget.max_bytes:
+        raise BudgetExceeded(
+            f"Query would scan {estimated_bytes:,} bytes, above the "
+            f"{budget.max_bytes:,} byte limit for this endpoint."
+        )
+
+
+def run_within_budget(client, query: str, job_config, budget: QueryBudget):
+    """
+    Run a query capped at budget.max_bytes billed, download at most
+    budget.max_rows + 1 rows and raise BudgetExceeded if there are more.
+    """
+    config = _copy_config(job_config, maximum_bytes_billed=budget.max_bytes)
+    rows = client.query(query, job_config=config).result(max_results=budget.max_rows + 1)
+    df = rows.to_dataframe()
+    if len(df) > budget.max_rows:
+        raise BudgetExceeded(
+            f"Query returns more than {budget.max_rows:,} rows, the limit for this endpoint."
+        )
+    return df
+
@@ -0,0 +1,361 @@
+"""
+Intraday price streaming: feed sources, bar aggregation and fan-out.
+
+  feed source  ->  BarAggregator  ->  StreamHub  ->  WebSocket subscribers
+  (yfinance /      (1m / 5m / 1h     (one JSON payload per update,
+   replay file)     bars per ticker,   shared by every subscriber queue)
+                    kept in BarRings)
+
+Everything here runs on the event loop, so no locking is needed. Only
+stdlib is imported at module level; yfinance is imported by its source.
+"""
+
+import asyncio
+import csv
+import dataclasses
+import json
+import math
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+
+INTERVALS = {"1m": 60, "5m": 300, "1h": 3600}
+
+BAR_FIELDS = ("ts", "open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class PriceUpdate:
+    """A trade / tick (open == high == low == close) or a small source bar."""
+
+    ticker: str
+    ts: float  # epoch seconds
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+
+    @classmethod
+    def tick(cls, ticker: str, ts: float, price: float, volume: float = 0.0) -> "PriceUpdate":
+        return cls(ticker, ts, price, price, price, price, volume)
+
+
+def _bar_dict(values) -> dict:
+    bar = dict(zip(BAR_FIELDS, values))
+    bar["time"] = datetime.fromtimestamp(bar["ts"], tz=timezone.utc).isoformat()
+    return bar
+
+
+# ===========================
+# STORAGE
+# ===========================
+
+class BarRing:
+    """
+    Fixed-capacity ring of OHLCV bars stored column-wise in array('d'),
+    i.e. 48 bytes per bar with no per-bar Python objects. The oldest bar
+    is overwritten once the ring is full.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._cols = [array("d", bytes(8 * capacity)) for _ in BAR_FIELDS]
+        self._start = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, values) -> None:
+        if self._len < self.capacity:
+            idx = (self._start + self._len) % self.capacity
+            self._len += 1
+        else:
+            idx = self._start
+            self._start = (self._start + 1) % self.capacity
+        for col, value in zip(self._cols, values):
+            col[idx] = value
+
+    def last(self, n: Optional[int] = None) -> List[dict]:
+        """Up to n most recent bars, oldest first."""
+        n = self._len if n is None else max(0, min(n, self._len))
+        first = self._start + self._len - n
+        bars = []
+        for i in range(first, first + n):
+            idx = i % self.capacity
+            bars.append(_bar_dict(col[idx] for col in self._cols))
+        return bars
+
+
+class BarAggregator:
+    """
+    Folds price updates into bars for every interval. Each update returns
+    events (ticker, interval, bar, closed): the in-progress bar after the
+    update, preceded by the previous bar if the update started a new one.
+    Updates older than a ticker's current bar are ignored.
+    """
+
+    def __init__(self, intervals: Dict[str, int] = INTERVALS, ring_size: int = 720):
+        self.intervals = dict(intervals)
+        self.ring_size = ring_size
+        self._rings: Dict[Tuple[str, str], BarRing] = {}
+        self._current: Dict[Tuple[str, str], list] = {}
+
+    def add(self, update: PriceUpdate) -> List[Tuple[str, str, dict, bool]]:
+        events = []
+        for name, seconds in self.intervals.items():
+            key = (update.ticker, name)
+            bucket = float(update.ts - update.ts % seconds)
+            bar = self._current.get(key)
+
+            if bar is not None and bucket < bar[0]:
+                continue  # late update for a bar that is already closed
+            if bar is None or bucket > bar[0]:
+                if bar is not None:
+                    self._ring(key).append(bar)
+                    events.append((update.ticker, name, _bar_dict(bar), True))
+                bar = [bucket, update.open, update.high, update.low, update.close, update.volume]
+                self._current[key] = bar
+            else:
+                bar[2] = max(bar[2], update.high)
+                bar[3] = min(bar[3], update.low)
+                bar[4] = update.close
+                bar[5] += update.volume
+            events.append((update.ticker, name, _bar_dict(bar), False))
+        return events
+
+    def _ring(self, key) -> BarRing:
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = BarRing(self.ring_size)
+        return ring
+
+    def snapshot(self, ticker: str, interval: str, limit: int) -> List[dict]:
+        """Recent closed bars plus the in-progress one, oldest first."""
+        key = (ticker, interval)
+        current = self._current.get(key)
+        ring = self._rings.get(key)
+        closed_limit = limit - 1 if current is not None else limit
+        bars = ring.last(closed_limit) if ring is not None and closed_limit > 0 else []
+        if current is not None and limit > 0:
+            bars.append(_bar_dict(current))
+        return bars
+
+
+# ===========================
+# FEED SOURCES
+# ===========================
+
+class FeedSource:
+    """Async iterator of PriceUpdates. Subclasses implement updates()."""
+
+    def updates(self) -> AsyncIterator[PriceUpdate]:
+        raise NotImplementedError
+
+
+class YFinancePollingSource(FeedSource):
+    """
+    Polls yfinance for 1-minute bars and emits each completed bar once.
+    yfinance is blocking, so downloads run in a worker thread.
+    """
+
+    def __init__(self, tickers: Iterable[str], poll_seconds: float = 60.0):
+        self.tickers = list(tickers)
+        self.poll_seconds = poll_seconds
+        self._last_ts: Dict[str, float] = {}
+
+    def _download(self) -> List[PriceUpdate]:
+        import yfinance as yf
+
+        data = yf.download(
+            self.tickers,
+            period="1d",
+            interval="1m",
+            group_by="ticker",
+            progress=False,
+        )
+        now = time.time()
+        updates = []
+        for ticker in self.tickers:
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            frame = data[ticker].dropna(subset=["Close"])
+            last_ts = self._last_ts.get(ticker, 0.0)
+            for stamp, row in frame.iterrows():
+                ts = stamp.timestamp()
+                # Skip bars already sent and the still-forming current minute
+                if ts <= last_ts or ts + 60 > now:
+                    continue
+                updates.append(
+                    PriceUpdate(
+                        ticker,
+                        ts,
+                        float(row["Open"]),
+                        float(row["High"]),
+                        float(row["Low"]),
+                        float(row["Close"]),
+                        float(row.get("Volume", 0.0) or 0.0),
+                    )
+                )
+                self._last_ts[ticker] = ts
+        return updates
+
+    async def updates(self) -> AsyncIterator[PriceUpdate]:
+        while True:
+            try:
+                batch = await asyncio.to_thread(self._download)
+            except Exception as e:
+                print(f"Intraday yfinance poll failed: {e}")
+                batch = []
+            for update in batch:
+                yield update
+            await asyncio.sleep(self.poll_seconds)
+
+
+def _parse_ts(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        stamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        return stamp.timestamp()
+
+
+class ReplayFileSource(FeedSource):
+    """
+    Replays updates from a CSV file with a header row. Columns:
+      ticker, timestamp (epoch seconds or ISO 8601), and either price or
+      open/high/low/close; volume is optional.
+    `speed` scales the original spacing (2.0 = twice as fast); 0 replays
+    without sleeping. With `loop`, the file is replayed forever; each pass
+    is shifted forward by the file's span rounded up to whole
+    `align_seconds`, plus one more, so it lands in new bars for every
+    interval up to `align_seconds` instead of being dropped as late.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False, align_seconds: int = 3600):
+        if loop and speed <= 0:
+            raise ValueError("A looping replay needs speed > 0.")
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.align_seconds = align_seconds
+
+    def _read(self) -> List[PriceUpdate]:
+        updates = []
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                ts = _parse_ts(row["timestamp"])
+                volume = float(row.get("volume") or 0.0)
+                if row.get("price"):
+                    updates.append(PriceUpdate.tick(row["ticker"].upper(), ts, float(row["price"]), volume))
+                else:
+                    updates.append(
+                        PriceUpdate(
+                            row["ticker"].upper(),
+                            ts,
+                            float(row["open"]),
+                            float(row["high"]),
+                            float(row["low"]),
+                            float(row["close"]),
+                            volume,
+                        )
+                    )
+        updates.sort(key=lambda u: u.ts)
+        return updates
+
+    async def updates(self) -> AsyncIterator[PriceUpdate]:
+        updates = await asyncio.to_thread(self._read)
+        if not updates:
+            return
+        span = updates[-1].ts - updates[0].ts
+        pass_shift = (math.ceil(span / self.align_seconds) + 1) * self.align_seconds
+        offset = 0.0
+        while True:
+            previous_ts = None
+            for update in updates:
+                if self.speed > 0 and previous_ts is not None:
+                    await asyncio.sleep(max(0.0, (update.ts - previous_ts) / self.speed))
+                else:
+                    await asyncio.sleep(0)  # let subscribers run between updates
+                previous_ts = update.ts
+                yield dataclasses.replace(update, ts=update.ts + offset) if offset else update
+            if not self.loop:
+                return
+            offset += pass_shift
+
+
+def create_feed_source(kind: str, tickers: Iterable[str], replay_file: Optional[str] = None,
+                       poll_seconds: float = 60.0, replay_speed: float = 1.0) -> Optional[FeedSource]:
+    """Build the configured feed: "yfinance", "replay" or "off" (None)."""
+    kind = (kind or "off").lower()
+    if kind == "off":
+        return None
+    if kind == "yfinance":
+        return YFinancePollingSource(tickers, poll_seconds=poll_seconds)
+    if kind == "replay":
+        if not replay_file:
+            raise ValueError("The replay intraday feed needs a replay file.")
+        return ReplayFileSource(replay_file, speed=replay_speed, loop=True)
+    raise ValueError(f"Unknown intraday feed: {kind}")
+
+
+# ===========================
+# FAN-OUT
+# ===========================
+
+class StreamHub:
+    """
+    Runs a feed through the aggregator and fans bar updates out to
+    subscriber queues. Each update is serialized to JSON once and the same
+    string is handed to every subscriber. Queues are bounded: a subscriber
+    that falls behind loses its oldest pending messages, not the others.
+    """
+
+    def __init__(self, aggregator: BarAggregator, queue_size: int = 256):
+        self.aggregator = aggregator
+        self.queue_size = queue_size
+        self._subscribers: Dict[Tuple[str, str], Set[asyncio.Queue]] = {}
+        self.running = False
+
+    def subscribe(self, keys: Iterable[Tuple[str, str]]) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        for key in keys:
+            self._subscribers.setdefault(key, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        for key in list(self._subscribers):
+            subs = self._subscribers[key]
+            subs.discard(queue)
+            if not subs:
+                del self._subscribers[key]
+
+    def subscriber_count(self) -> int:
+        return len({q for subs in self._subscribers.values() for q in subs})
+
+    def publish(self, events) -> None:
+        for ticker, interval, bar, closed in events:
+            subs = self._subscribers.get((ticker, interval))
+            if not subs:
+                continue
+            message = json.dumps(
+                {"type": "bar", "ticker": ticker, "interval": interval, "closed": closed, "bar": bar}
+            )
+            for queue in subs:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(message)
+
+    async def run(self, source: FeedSource) -> None:
+        self.running = True
+        try:
+            async for update in source.updates():
+                self.publish(self.aggregator.add(update))
+        finally:
+            self.running = False
@@ -1,18 +1,27 @@
 import os
+import asyncio
+import json
 import math
-from datetime import date, datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
 
-import numpy as np
-import pandas as pd
-import requests
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from google.cloud import bigquery
-from openai import OpenAI
 from pydantic import BaseModel
 
-from .sql_generator import generate_sql  # currently unused, but kept for future
-from .ai_responder import respond_as_ai  # currently unused, but kept for future
+# pandas, numpy, requests, google-cloud-bigquery and openai are imported
+# inside the functions that use them, so the app starts (and /health
+# answers) without loading them. See providers.py.
+from .prompt_engine import complete, get_token_stats, render_csv
+from .news_pipeline import process_articles
+from .article_store import ArticleStore
+from .providers import lazy_singleton, start_warm_up
+from .cache import create_cache, make_key
+from .guardrails import BudgetExceeded, QueryBudget, check_bytes, dry_run_bytes, run_within_budget
+from .intraday import INTERVALS, BarAggregator, StreamHub, create_feed_source
 
 
 # ===========================
@@ -26,6 +35,54 @@ GOLD_TABLE = os.environ.get("GOLD_TABLE", "gold")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
+# How long a per-ticker sentiment result from /news-sentiment/batch is reused
+NEWS_SENTIMENT_TTL_SECONDS = int(os.getenv("NEWS_SENTIMENT_TTL_SECONDS", "900"))
+
+# Local article store; NewsAPI is polled for deltas every NEWS_REFRESH_SECONDS
+NEWS_DB_PATH = os.getenv("NEWS_DB_PATH", "/tmp/faang_news.db")
+NEWS_REFRESH_SECONDS = int(os.getenv("NEWS_REFRESH_SECONDS", "600"))
+NEWS_FETCH_PAGE_SIZE = 100  # NewsAPI maximum
+NEWS_MAX_FETCH_PAGES = int(os.getenv("NEWS_MAX_FETCH_PAGES", "5"))  # per refresh, to catch up after a gap
+# NewsAPI indexes articles late; refetch this far behind the watermark (dedup absorbs repeats)
+NEWS_FETCH_OVERLAP_SECONDS = int(os.getenv("NEWS_FETCH_OVERLAP_SECONDS", str(6 * 3600)))
+
+# Cache backend: "memory" (per worker process) or "redis" (shared, needs REDIS_URL)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+QUERY_CACHE_TTL_SECONDS = int(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "900"))
+
+# Per-endpoint BigQuery budgets: bytes a query may scan, rows it may return
+MAX_QUERY_BYTES = int(os.getenv("MAX_QUERY_BYTES", str(500 * 1024 ** 2)))
+QUERY_BUDGETS = {
+    "ask": QueryBudget(max_bytes=MAX_QUERY_BYTES, max_rows=80),
+    "chart-data": QueryBudget(max_bytes=MAX_QUERY_BYTES, max_rows=5001),  # page + look-ahead row
+    "compare-stocks": QueryBudget(max_bytes=MAX_QUERY_BYTES, max_rows=1000),
+    "faang-dashboard": QueryBudget(max_bytes=MAX_QUERY_BYTES, max_rows=1000),
+    "analytics": QueryBudget(max_bytes=2 * MAX_QUERY_BYTES, max_rows=50000),
+}
+DRY_RUN_CACHE_TTL_SECONDS = 3600
+
+# Pagination / fan-out caps for user-controlled sizes
+MAX_CHART_PAGE_SIZE = 5000
+MAX_NEWS_PAGE_SIZE = 50
+MAX_SENTIMENT_ARTICLES = 20
+MAX_TICKERS_PER_REQUEST = 20
+
+# Intraday streaming: feed is "off", "yfinance" (1m polling) or "replay" (CSV file).
+# Off by default: every worker that enables yfinance polls Yahoo on its own.
+INTRADAY_FEED = os.getenv("INTRADAY_FEED", "off")
+INTRADAY_REPLAY_FILE = os.getenv("INTRADAY_REPLAY_FILE")
+INTRADAY_REPLAY_SPEED = float(os.getenv("INTRADAY_REPLAY_SPEED", "1.0"))
+INTRADAY_POLL_SECONDS = float(os.getenv("INTRADAY_POLL_SECONDS", "60"))
+INTRADAY_RING_SIZE = int(os.getenv("INTRADAY_RING_SIZE", "720"))  # bars kept per ticker / interval
+INTRADAY_QUEUE_SIZE = 256  # pending messages per WebSocket before the oldest are dropped
+MAX_INTRADAY_SNAPSHOT = 500
+
+# Load the heavy stack in the background right after startup
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "1") == "1"
+
 # Map FAANG tickers to company names (for news)
 # Map FAANG tickers to company names (for news)
 TICKER_TO_COMPANY = {
@@ -53,61 +110,94 @@ FINANCE_DOMAINS = ",".join(
     ]
 )
 
-# Additional safety: only accept these source names from the API
-REPUTED_SOURCES = {
-    "Bloomberg",
-    "Reuters",
-    "The Wall Street Journal",
-    "CNBC",
-    "Financial Times",
-    "MarketWatch",
-    "Yahoo Finance",
-    "Barron’s",
-    "Barron's",
-    "The Motley Fool",
-    "Seeking Alpha",
-    "Investor's Business Daily",
-}
+# ===========================
+# CLIENTS
+# ===========================
 
-STOCK_KEYWORDS = [
-    "stock",
-    "shares",
-    "earnings",
-    "quarter",
-    "q1",
-    "q2",
-    "q3",
-    "q4",
-    "guidance",
-    "outlook",
-    "revenue",
-    "profit",
-    "loss",
-    "valuation",
-    "price target",
-    "analyst",
-    "dividend",
-]
+@lazy_singleton
+def get_bq_client():
+    from google.cloud import bigquery
 
+    return bigquery.Client(project=PROJECT_ID)
 
-def is_stock_related(title: str, description: str, company: str) -> bool:
-    """
-    Returns True if the article looks like it's about the company's stock/financial performance.
-    """
-    text = f"{title or ''} {description or ''}".lower()
-    if company.lower() not in text:
-        # Must at least mention the company
-        return False
-    return any(k in text for k in STOCK_KEYWORDS)
 
+@lazy_singleton
+def get_openai_client():
+    """Returns None when OPENAI_API_KEY is not set."""
+    if not OPENAI_API_KEY:
+        return None
+    from openai import OpenAI
 
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+
+@lazy_singleton
+def get_article_store():
+    return ArticleStore(NEWS_DB_PATH)
+
+
+@lazy_singleton
+def get_cache():
+    return create_cache(CACHE_BACKEND, redis_url=REDIS_URL, max_entries=CACHE_MAX_ENTRIES)
 
-# ===========================
-# CLIENTS
-# ===========================
 
-bq_client = bigquery.Client(project=PROJECT_ID)
-openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+@lazy_singleton
+def get_stream_hub():
+    aggregator = BarAggregator(INTERVALS, ring_size=INTRADAY_RING_SIZE)
+    return StreamHub(aggregator, queue_size=INTRADAY_QUEUE_SIZE)
+
+
+def run_query(query: str, job_config=None, endpoint: Optional[str] = None):
+    """
+    Run a BigQuery query and return a DataFrame, cached by query text and
+    parameters for QUERY_CACHE_TTL_SECONDS. With an endpoint name the query
+    is held to QUERY_BUDGETS[endpoint]: it is dry-run first (estimate cached)
+    and rejected with a 400 if it would scan or return too much. Row-cap
+    rejections are cached like results, so repeats do not re-run the job.
+    """
+    params = [p.to_api_repr() for p in job_config.query_parameters] if job_config else []
+    budget = QUERY_BUDGETS.get(endpoint)
+    if budget is None:
+        return get_cache().get_or_compute(
+            make_key("bq", query, params),
+            QUERY_CACHE_TTL_SECONDS,
+            lambda: get_bq_client().query(query, job_config=job_config).to_dataframe(),
+        )
+
+    try:
+        estimated = get_cache().get_or_compute(
+            make_key("bq-dry-run", query, params),
+            DRY_RUN_CACHE_TTL_SECONDS,
+            lambda: dry_run_bytes(get_bq_client(), query, job_config),
+        )
+        check_bytes(estimated, budget)
+
+        def run_or_reject():
+            # Cache a row-cap rejection too, or every repeat re-runs (and re-bills) the job
+            try:
+                return run_within_budget(get_bq_client(), query, job_config, budget)
+            except BudgetExceeded as e:
+                return {"budget_exceeded": str(e)}
+
+        result = get_cache().get_or_compute(
+            make_key("bq", query, params, budget.max_rows),
+            QUERY_CACHE_TTL_SECONDS,
+            run_or_reject,
+        )
+        if isinstance(result, dict):
+            raise BudgetExceeded(result["budget_exceeded"])
+        return result
+    except BudgetExceeded as e:
+        raise HTTPException(status_code=400, detail=f"{e} Narrow the request (fewer tickers or days).")
+
+
+def cached_complete(client, name: str, **values) -> str:
+    """prompt_engine.complete, cached by template and values for LLM_CACHE_TTL_SECONDS."""
+    return get_cache().get_or_compute(
+        make_key("llm", name, values),
+        LLM_CACHE_TTL_SECONDS,
+        lambda: complete(client, name, **values),
+    )
 
 
 # ===========================
@@ -147,6 +237,15 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def warm_up_clients():
+    if WARM_UP_ON_STARTUP:
+        start_warm_up(
+            modules=["numpy", "pandas", "requests", "google.cloud.bigquery", "openai"],
+            providers=[get_cache, get_article_store, get_openai_client, get_bq_client],
+        )
+
+
 # ===========================
 # MODELS
 # ===========================
@@ -158,6 +257,208 @@ class CompareRequest(BaseModel):
     ticker1: str
     ticker2: str
     days: int = 60  # lookback window
+    narrative: bool = True  # False skips the LLM and returns numbers only
+
+# ===========================
+# NEWS HELPERS
+# ===========================
+
+def fetch_news_articles(
+    company: str,
+    page_size: int,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> list:
+    """
+    Query NewsAPI for recent stock-related articles about a company,
+    restricted to FINANCE_DOMAINS and, if given, published at or after
+    `since` and at or before `until`. Returns the raw article dicts,
+    newest first.
+    """
+    params = {
+        "q": f'"{company}" AND (stock OR shares OR earnings OR guidance OR analyst)',
+        "language": "en",
+        "sortBy": "publishedAt",
+        "pageSize": page_size,
+        "apiKey": NEWS_API_KEY,
+        "domains": FINANCE_DOMAINS,
+    }
+    if since:
+        params["from"] = since
+    if until:
+        params["to"] = until
+
+    import requests
+
+    resp = requests.get("https://newsapi.org/v2/everything", params=params)
+    if resp.status_code != 200:
+        raise HTTPException(
+            status_code=500,
+            detail=f"News API error: {resp.status_code} {resp.text}",
+        )
+
+    return resp.json().get("articles", [])
+
+
+_refresh_locks = {}
+_refresh_locks_guard = threading.Lock()
+
+
+def _fetch_since(company: str, since: Optional[str]) -> list:
+    """
+    All articles published at or after `since`. A full page may hide older
+    articles, so keep paging backwards in time (`to` = oldest article seen)
+    until a page comes back short, up to NEWS_MAX_FETCH_PAGES requests.
+    A cold store (no `since`) only takes the newest page.
+    """
+    articles = []
+    until = None
+    for _ in range(NEWS_MAX_FETCH_PAGES):
+        page = fetch_news_articles(company, NEWS_FETCH_PAGE_SIZE, since=since, until=until)
+        articles.extend(page)
+        oldest = min((a["publishedAt"] for a in page if a.get("publishedAt")), default=None)
+        if since is None or len(page) < NEWS_FETCH_PAGE_SIZE or oldest is None or oldest == until:
+            return articles
+        until = oldest
+    print(
+        f"News fetch for {company} stopped after {NEWS_MAX_FETCH_PAGES} pages; "
+        f"articles between {since} and {until} were skipped."
+    )
+    return articles
+
+
+def _fetch_from(watermark: Optional[str]) -> Optional[str]:
+    """`from` for the next fetch: NEWS_FETCH_OVERLAP_SECONDS before the watermark."""
+    if not watermark:
+        return None
+    try:
+        newest = datetime.fromisoformat(watermark.replace("Z", "+00:00"))
+    except ValueError:
+        return watermark
+    if newest.tzinfo is None:
+        newest = newest.replace(tzinfo=timezone.utc)
+    since = newest - timedelta(seconds=NEWS_FETCH_OVERLAP_SECONDS)
+    return since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def refresh_news(symbol: str) -> int:
+    """
+    Fetch articles from NewsAPI, starting NEWS_FETCH_OVERLAP_SECONDS before
+    the ticker's watermark to pick up late-indexed ones, and add them to the
+    local store (already-stored articles are deduplicated). Articles are tagged with every FAANG ticker
+    they cover, not only `symbol`. Returns the number of new articles.
+    """
+    with _refresh_locks_guard:
+        lock = _refresh_locks.setdefault(symbol, threading.Lock())
+
+    _, seen_fetch_at = get_article_store().fetch_state(symbol)
+    with lock:
+        watermark, last_fetch_at = get_article_store().fetch_state(symbol)
+        # Another thread refreshed while we waited for the lock
+        if last_fetch_at != seen_fetch_at:
+            return 0
+
+        company = TICKER_TO_COMPANY.get(symbol, symbol)
+        raw = _fetch_since(company, _fetch_from(watermark))
+        matches = process_articles(
+            raw, [symbol, *TICKER_TO_COMPANY], None, TICKER_TO_COMPANY
+        )
+        added = get_article_store().add_articles(matches)
+        newest = max((a["publishedAt"] for a in raw if a.get("publishedAt")), default=None)
+        get_article_store().mark_fetched(symbol, newest)
+        return added
+
+
+def ensure_news(symbol: str) -> None:
+    """
+    Make sure the local store can answer for a ticker. NewsAPI is only hit
+    here on a cold store or when the background refresher has fallen
+    behind (or never covers the ticker); otherwise this is a no-op.
+    """
+    _, last_fetch_at = get_article_store().fetch_state(symbol)
+    max_age = NEWS_REFRESH_SECONDS
+    if symbol in TICKER_TO_COMPANY:
+        max_age *= 2  # kept fresh by the background refresher
+    if last_fetch_at and time.time() - last_fetch_at < max_age:
+        return
+
+    if not NEWS_API_KEY:
+        if last_fetch_at:
+            return
+        raise HTTPException(
+            status_code=500,
+            detail="NEWS_API_KEY is not set on the server.",
+        )
+
+    try:
+        refresh_news(symbol)
+    except HTTPException:
+        # Stale local data beats no data
+        if not last_fetch_at:
+            raise
+
+
+def _news_refresh_loop() -> None:
+    while True:
+        for symbol in TICKER_TO_COMPANY:
+            # With a shared cache only one worker refreshes each ticker per interval
+            if not get_cache().add(f"news-refresh:{symbol}", os.getpid(), NEWS_REFRESH_SECONDS):
+                continue
+            # Without one, the shared store tells whether another worker just did
+            _, last_fetch_at = get_article_store().fetch_state(symbol)
+            if last_fetch_at and time.time() - last_fetch_at < NEWS_REFRESH_SECONDS:
+                continue
+            try:
+                refresh_news(symbol)
+            except Exception as e:
+                print(f"News refresh failed for {symbol}: {e}")
+        time.sleep(NEWS_REFRESH_SECONDS)
+
+
+@app.on_event("startup")
+def start_news_refresher():
+    if NEWS_API_KEY:
+        threading.Thread(target=_news_refresh_loop, name="news-refresh", daemon=True).start()
+
+
+@app.on_event("startup")
+async def start_intraday_feed():
+    source = create_feed_source(
+        INTRADAY_FEED,
+        list(TICKER_TO_COMPANY),
+        replay_file=INTRADAY_REPLAY_FILE,
+        poll_seconds=INTRADAY_POLL_SECONDS,
+        replay_speed=INTRADAY_REPLAY_SPEED,
+    )
+    if source is not None:
+        # Keep a reference so the task is not garbage collected
+        app.state.intraday_task = asyncio.create_task(get_stream_hub().run(source))
+
+
+def _parse_tickers(tickers: str) -> list:
+    """Comma-separated tickers -> upper-cased, de-duplicated list (400 if empty or too many)."""
+    symbols = list(dict.fromkeys(t.strip().upper() for t in tickers.split(",") if t.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="Provide at least one ticker.")
+    if len(symbols) > MAX_TICKERS_PER_REQUEST:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_TICKERS_PER_REQUEST} tickers per request.",
+        )
+    return symbols
+
+
+def _check_interval(interval: str) -> None:
+    if interval not in INTERVALS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown interval: {interval}. Choose from: {', '.join(INTERVALS)}.",
+        )
+
+
+def _sentiment_key(symbol: str, limit: int) -> str:
+    return make_key("news-sentiment", symbol, limit)
+
 
 # ===========================
 # ROUTES
@@ -169,16 +470,32 @@ def health():
     return {"status": "ok", "service": "faang-in-sight"}
 
 
+@app.get("/cache-stats")
+def cache_stats():
+    """Hit/miss counters of this worker's view of the cache."""
+    return get_cache().stats()
+
+
+@app.get("/prompt-stats")
+def prompt_stats():
+    """Per-template LLM token usage since process start."""
+    return {"templates": get_token_stats()}
+
+
 @app.post("/ask")
 def ask(request: AskRequest):
     """
     Take a natural language question, pull recent FAANG data from BigQuery,
     and have OpenAI generate a human-friendly insight.
     """
+    import numpy as np
+    import pandas as pd
+
     question = (request.question or "").strip()
     if not question:
         raise HTTPException(status_code=400, detail="Question must not be empty.")
 
+    openai_client = get_openai_client()
     if openai_client is None:
         raise HTTPException(
             status_code=500,
@@ -199,8 +516,9 @@ def ask(request: AskRequest):
         FROM `{PROJECT_ID}.{DATASET}.{GOLD_TABLE}`
         WHERE trade_date >= DATE_SUB(CURRENT_DATE(), INTERVAL 60 DAY)
         ORDER BY trade_date DESC
+        LIMIT {QUERY_BUDGETS["ask"].max_rows}
     """
-    df = bq_client.query(query).to_dataframe()
+    df = run_query(query, endpoint="ask")
 
     if df.empty:
         raise HTTPException(
@@ -212,53 +530,10 @@ def ask(request: AskRequest):
     df = df.replace([np.inf, -np.inf], np.nan)
     df = df.where(pd.notnull(df), None)
 
-    df_preview = df.head(80)
-    df_str = df_preview.to_string(index=False)
-
-    prompt = f"""
-You are a friendly financial analyst focusing on FAANG stocks
-(Apple - AAPL, Amazon - AMZN, Meta - META, Netflix - NFLX, Google - GOOGL).
-
-User question:
-{question}
-
-You have recent daily data from the FAANG gold table (preview):
-
-{df_str}
-
-Columns:
-- ticker: stock symbol
-- trade_date: date
-- close: closing price
-- daily_return: day-over-day return
-- cumulative_return: compounded return
-- rsi_14: 14-day RSI
-- ma_20, ma_50: moving averages
-
-Task:
-- Answer the user's question in 2–3 short paragraphs.
-- Focus on trends, momentum, and risk.
-- If the user mentions specific tickers, focus on those.
-- Do not invent exact numbers; speak qualitatively.
-- Do NOT give explicit investment advice.
-"""
+    df_str = render_csv(df, max_rows=80)
 
     try:
-        completion = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a clear, concise, neutral stock analyst. You do not give investment advice.",
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                },
-            ],
-            temperature=0.7,
-        )
-        answer = completion.choices[0].message.content.strip()
+        answer = cached_complete(openai_client, "ask", question=question, data=df_str)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OpenAI error: {str(e)}")
 
@@ -266,11 +541,24 @@ Task:
 
 
 @app.get("/chart-data")
-def chart_data(ticker: str = "AAPL"):
+def chart_data(
+    ticker: str = "AAPL",
+    limit: int = 1000,
+    cursor: Optional[date] = None,
+):
     """
     Returns time-series charting data for price + moving averages.
     Cleans NaN/Inf values so JSON encoding does not fail.
+    The first page holds the most recent `limit` points (oldest first within
+    the page); when older points exist, pass the returned `next_cursor`
+    (a trade_date) as `cursor` to page backwards in time.
     """
+    import numpy as np
+    import pandas as pd
+    from google.cloud import bigquery
+
+    limit = max(1, min(limit, MAX_CHART_PAGE_SIZE))
+
     query = f"""
         SELECT
           trade_date,
@@ -283,18 +571,33 @@ def chart_data(ticker: str = "AAPL"):
           ma_50
         FROM `{PROJECT_ID}.{DATASET}.{GOLD_TABLE}`
         WHERE ticker = @ticker
-        ORDER BY trade_date
+          AND (@cursor IS NULL OR trade_date < @cursor)
+        ORDER BY trade_date DESC
+        LIMIT @page_rows
     """
 
     job_config = bigquery.QueryJobConfig(
-        query_parameters=[bigquery.ScalarQueryParameter("ticker", "STRING", ticker)]
+        query_parameters=[
+            bigquery.ScalarQueryParameter("ticker", "STRING", ticker),
+            bigquery.ScalarQueryParameter("cursor", "DATE", cursor),
+            # One extra row tells us whether another page exists
+            bigquery.ScalarQueryParameter("page_rows", "INT64", limit + 1),
+        ]
     )
 
-    df = bq_client.query(query, job_config=job_config).to_dataframe()
+    df = run_query(query, job_config=job_config, endpoint="chart-data")
 
-    if df.empty:
+    if df.empty and cursor is None:
         raise HTTPException(status_code=404, detail=f"No data found for ticker: {ticker}")
 
+    next_cursor = None
+    if len(df) > limit:
+        df = df.head(limit)
+        next_cursor = df["trade_date"].iloc[-1].isoformat()
+
+    # Newest-first from the query; charts want ascending dates
+    df = df.iloc[::-1]
+
     # Replace inf with NaN
     df = df.replace([np.inf, -np.inf], np.nan)
 
@@ -323,75 +626,38 @@ def chart_data(ticker: str = "AAPL"):
     return {
         "ticker": ticker.upper(),
         "points": points,
+        "next_cursor": next_cursor,
     }
 
 
 @app.get("/news")
-def get_news(ticker: str = "AAPL", limit: int = 10):
+def get_news(
+    ticker: str = "AAPL",
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+):
     """
-    Fetch recent news for a ticker from reputable, finance-focused sources only.
-    Filters:
+    Recent news for a ticker from reputable, finance-focused sources only,
+    served from the local article store.
+    Filters (applied when articles are fetched):
       - Only domains in FINANCE_DOMAINS
       - Only sources in REPUTED_SOURCES (if present)
       - Only headlines that look stock/earnings related
+    Pagination: pass the returned `next_cursor` as `cursor`.
+    Search: `q` restricts to articles whose title/description match all terms.
     """
     symbol = ticker.upper()
     company = TICKER_TO_COMPANY.get(symbol, symbol)
+    limit = max(1, min(limit, MAX_NEWS_PAGE_SIZE))
 
-    if not NEWS_API_KEY:
-        raise HTTPException(
-            status_code=500,
-            detail="NEWS_API_KEY is not set on the server.",
-        )
-
-    params = {
-        "q": f'"{company}" AND (stock OR shares OR earnings OR guidance OR analyst)',
-        "language": "en",
-        "sortBy": "publishedAt",
-        "pageSize": limit * 2,  # fetch extra, we'll filter down
-        "apiKey": NEWS_API_KEY,
-        "domains": FINANCE_DOMAINS,
-    }
-
-    resp = requests.get("https://newsapi.org/v2/everything", params=params)
-    if resp.status_code != 200:
-        raise HTTPException(
-            status_code=500,
-            detail=f"News API error: {resp.status_code} {resp.text}",
-        )
-
-    data = resp.json()
-    articles = data.get("articles", [])
-
-    filtered = []
-    for a in articles:
-        title = a.get("title") or ""
-        description = a.get("description") or ""
-        source_obj = a.get("source") or {}
-        source_name = source_obj.get("name") or ""
-
-        # Only keep from reputable sources (if name is available)
-        if source_name and source_name not in REPUTED_SOURCES:
-            continue
-
-        # Only keep if it's clearly about the company's stock / earnings
-        if not is_stock_related(title, description, company):
-            continue
-
-        filtered.append(
-            {
-                "title": title,
-                "description": description,
-                "source": source_name,
-                "url": a.get("url"),
-                "published_at": a.get("publishedAt"),
-            }
-        )
-
-        if len(filtered) >= limit:
-            break
+    ensure_news(symbol)
+    try:
+        filtered, next_cursor = get_article_store().query(symbol, limit, cursor=cursor, search=q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    if not filtered:
+    if not filtered and not cursor:
         raise HTTPException(
             status_code=404, detail="No suitable stock-related news articles found."
         )
@@ -400,6 +666,7 @@ def get_news(ticker: str = "AAPL", limit: int = 10):
         "ticker": symbol,
         "company": company,
         "articles": filtered,
+        "next_cursor": next_cursor,
     }
 
 
@@ -411,64 +678,11 @@ def news_sentiment(ticker: str = "AAPL", limit: int = 10):
     """
     symbol = ticker.upper()
     company = TICKER_TO_COMPANY.get(symbol, symbol)
+    limit = max(1, min(limit, MAX_SENTIMENT_ARTICLES))
 
-    if not NEWS_API_KEY:
-        raise HTTPException(
-            status_code=500,
-            detail="NEWS_API_KEY is not set on the server.",
-        )
-
-    params = {
-        "q": f'"{company}" AND (stock OR shares OR earnings OR guidance OR analyst)',
-        "language": "en",
-        "sortBy": "publishedAt",
-        "pageSize": limit * 2,
-        "apiKey": NEWS_API_KEY,
-        "domains": FINANCE_DOMAINS,
-    }
-
-    resp = requests.get("https://newsapi.org/v2/everything", params=params)
-    if resp.status_code != 200:
-        raise HTTPException(
-            status_code=500,
-            detail=f"News API error: {resp.status_code} {resp.text}",
-        )
-
-    data = resp.json()
-    articles = data.get("articles", [])
-    if not articles:
-        raise HTTPException(status_code=404, detail="No news articles found.")
-
-    headlines_for_llm = []
-    headlines_for_client = []
-
-    for a in articles:
-        title = a.get("title") or ""
-        description = a.get("description") or ""
-        source_obj = a.get("source") or {}
-        source_name = source_obj.get("name") or ""
-        url = a.get("url")
-
-        # Reputable sources only
-        if source_name and source_name not in REPUTED_SOURCES:
-            continue
-
-        # Stock-related only
-        if not is_stock_related(title, description, company):
-            continue
-
-        headlines_for_llm.append(f"- [{source_name}] {title}")
-        headlines_for_client.append(
-            {
-                "title": title,
-                "source": source_name,
-                "url": url,
-                "published_at": a.get("publishedAt"),
-            }
-        )
-
-        if len(headlines_for_client) >= limit:
-            break
+    ensure_news(symbol)
+    headlines_for_client, _ = get_article_store().query(symbol, limit)
+    headlines_for_llm = [f"- [{a['source']}] {a['title']}" for a in headlines_for_client]
 
     if not headlines_for_client:
         raise HTTPException(
@@ -478,44 +692,21 @@ def news_sentiment(ticker: str = "AAPL", limit: int = 10):
 
     headlines_text = "\n".join(headlines_for_llm)
 
+    openai_client = get_openai_client()
     if openai_client is None:
         raise HTTPException(
             status_code=500,
             detail="OPENAI_API_KEY environment variable is not set.",
         )
 
-    prompt = f"""
-You are a neutral news sentiment analyst.
-
-Here are recent *stock/finance* headlines for {company} ({symbol})
-from reputable business/finance outlets:
-
-{headlines_text}
-
-Tasks:
-- Summarize the overall sentiment (e.g., mostly positive, mostly negative, or mixed).
-- Explicitly mention a few of the sources by name (for example, "According to Bloomberg and CNBC...").
-- Highlight any recurring stock-related themes (earnings beats/misses, guidance, analyst rating changes, regulation, etc.).
-- Keep it short: 2–3 paragraphs.
-- Do NOT give trading or investment advice.
-"""
-
     try:
-        completion = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You summarize stock market news objectively and mention the outlets you reference.",
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                },
-            ],
-            temperature=0.4,
+        sentiment_summary = cached_complete(
+            openai_client,
+            "news_sentiment",
+            company=company,
+            symbol=symbol,
+            headlines=headlines_text,
         )
-        sentiment_summary = completion.choices[0].message.content.strip()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OpenAI error: {str(e)}")
 
@@ -525,6 +716,112 @@ Tasks:
         "articles": headlines_for_client,
         "sentiment_summary": sentiment_summary,
     }
+
+
+@app.get("/news-sentiment/batch")
+def news_sentiment_batch(tickers: str = "AAPL,AMZN,META,NFLX,GOOGL", limit: int = 5):
+    """
+    News sentiment for several tickers at once.
+      - Articles come from the local store (stale tickers refreshed concurrently)
+      - Articles shared between companies are sent to the LLM only once
+      - One structured (JSON) completion covers every ticker
+      - Results are cached per ticker for NEWS_SENTIMENT_TTL_SECONDS
+    Tickers whose news cannot be fetched or filtered are reported in "errors".
+    """
+    symbols = _parse_tickers(tickers)
+    limit = max(1, min(limit, MAX_SENTIMENT_ARTICLES))
+
+    results = {}
+    errors = {}
+    pending = []
+    for symbol in symbols:
+        cached = get_cache().get(_sentiment_key(symbol, limit))
+        if cached is not None:
+            results[symbol] = cached
+        else:
+            pending.append(symbol)
+
+    if pending:
+        openai_client = get_openai_client()
+        if openai_client is None:
+            raise HTTPException(
+                status_code=500,
+                detail="OPENAI_API_KEY environment variable is not set.",
+            )
+
+        # Bring the local store up to date for all pending tickers at once
+        with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+            futures = {symbol: pool.submit(ensure_news, symbol) for symbol in pending}
+
+        fetched_symbols = []
+        for symbol in pending:
+            try:
+                futures[symbol].result()
+                fetched_symbols.append(symbol)
+            except HTTPException as e:
+                errors[symbol] = e.detail
+
+        # Number each distinct article once; tickers refer to those numbers
+        article_ids = {}
+        headline_lines = []
+        ticker_articles = {}
+        for symbol in fetched_symbols:
+            company = TICKER_TO_COMPANY.get(symbol, symbol)
+            selected, _ = get_article_store().query(symbol, limit)
+            if not selected:
+                errors[symbol] = "No suitable stock-related news articles found from reputable sources."
+                continue
+
+            ids = []
+            for article in selected:
+                key = article["url"] or article["title"]
+                if key not in article_ids:
+                    article_ids[key] = len(article_ids) + 1
+                    headline_lines.append(
+                        f"{article_ids[key]}. [{article['source']}] {article['title']}"
+                    )
+                ids.append(article_ids[key])
+            ticker_articles[symbol] = (company, selected, ids)
+
+        if ticker_articles:
+            ticker_lines = [
+                f"{symbol} ({company}): {', '.join(str(i) for i in ids)}"
+                for symbol, (company, _, ids) in ticker_articles.items()
+            ]
+            try:
+                # Not cached here: results are cached per ticker below
+                raw_json = complete(
+                    openai_client,
+                    "news_sentiment_batch",
+                    headlines="\n".join(headline_lines),
+                    tickers="\n".join(ticker_lines),
+                )
+                parsed = json.loads(raw_json)
+                if not isinstance(parsed, dict):
+                    raise ValueError("expected a JSON object keyed by ticker")
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"OpenAI error: {str(e)}")
+
+            for symbol, (company, selected, _) in ticker_articles.items():
+                entry = parsed.get(symbol)
+                if not isinstance(entry, dict) or not entry:
+                    errors[symbol] = "The model returned no usable sentiment for this ticker."
+                    continue
+                result = {
+                    "ticker": symbol,
+                    "company": company,
+                    "articles": selected,
+                    "sentiment": entry.get("sentiment"),
+                    "sentiment_summary": entry.get("summary"),
+                }
+                results[symbol] = result
+                get_cache().set(_sentiment_key(symbol, limit), result, NEWS_SENTIMENT_TTL_SECONDS)
+
+    return {
+        "tickers": [s for s in symbols if s in results],
+        "results": results,
+        "errors": errors,
+    }
     
 @app.post("/compare-stocks")
 def compare_stocks(req: CompareRequest):
@@ -532,9 +829,17 @@ def compare_stocks(req: CompareRequest):
     Compare two tickers over the last N days using the gold table + OpenAI.
     Returns:
       - small stats table per ticker
-      - Apple-style 'card' analysis as markdown text
+      - numeric analytics (correlation, volatility, drawdowns, distribution)
+      - Apple-style 'card' analysis as markdown text (None if narrative=False)
     """
-    if openai_client is None:
+    import numpy as np
+    import pandas as pd
+    from google.cloud import bigquery
+
+    from .analytics import compute_analytics, price_matrix
+
+    openai_client = get_openai_client()
+    if req.narrative and openai_client is None:
         raise HTTPException(
             status_code=500,
             detail="OPENAI_API_KEY environment variable is not set.",
@@ -564,6 +869,7 @@ def compare_stocks(req: CompareRequest):
         WHERE trade_date >= DATE_SUB(CURRENT_DATE(), INTERVAL @days DAY)
           AND ticker IN (@t1, @t2)
         ORDER BY trade_date DESC
+        LIMIT {QUERY_BUDGETS["compare-stocks"].max_rows + 1}
     """
 
     job_config = bigquery.QueryJobConfig(
@@ -574,7 +880,7 @@ def compare_stocks(req: CompareRequest):
         ]
     )
 
-    df = bq_client.query(query, job_config=job_config).to_dataframe()
+    df = run_query(query, job_config=job_config, endpoint="compare-stocks")
     if df.empty:
         raise HTTPException(
             status_code=404,
@@ -583,6 +889,15 @@ def compare_stocks(req: CompareRequest):
 
     # Clean inf/nan
     df = df.replace([np.inf, -np.inf], np.nan)
+
+    dates, prices = price_matrix(df, [t1, t2])
+    stats = compute_analytics(
+        dates,
+        [t1, t2],
+        prices,
+        metrics=("summary", "correlation", "volatility", "drawdown", "distribution"),
+    )
+
     df = df.where(pd.notnull(df), None)
 
     # Simple per-ticker summary (most recent row per ticker)
@@ -600,86 +915,111 @@ def compare_stocks(req: CompareRequest):
         .reset_index()
     )
 
-    summary_str = summary.to_string(index=False)
-    preview_str = df.head(60).to_string(index=False)
-
-    prompt = f"""
-You are a neutral, professional equity analyst.
-
-Your job is to produce an Apple-style card layout in MARKDOWN only.
-Do NOT include JSON, just headings and bullet points / short sentences.
+    analysis = None
+    if req.narrative:
+        summary_str = render_csv(summary)
+        preview_str = render_csv(df, max_rows=60)
+
+        try:
+            analysis = cached_complete(
+                openai_client,
+                "compare_stocks",
+                t1=t1,
+                t2=t2,
+                days=days,
+                summary=summary_str,
+                preview=preview_str,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"OpenAI error: {str(e)}")
 
-Context:
-- We are comparing two FAANG stocks: {t1} and {t2}
-- Lookback window: last {days} trading days
-
-Here is a compact per-ticker summary table (one row per ticker):
-{summary_str}
+    return {
+        "ticker1": t1,
+        "ticker2": t2,
+        "days": days,
+        "table": summary.to_dict(orient="records"),
+        "stats": stats,
+        "analysis": analysis,
+    }
 
-Sample of recent daily rows:
-{preview_str}
 
-Columns:
-- last_close, avg_daily_return, last_cumulative_return
-- last_rsi (rsi_14)
-- last_ma20 (ma_20), last_ma50 (ma_50)
-- daily_return and cumulative_return show recent momentum
-- rsi_14 indicates overbought/oversold tendencies
-- ma_20 vs ma_50 describes short vs medium-term trend
+@app.get("/analytics")
+def analytics_report(
+    tickers: str = "AAPL,AMZN,META,NFLX,GOOGL",
+    days: int = 180,
+    window: int = 20,
+    metrics: Optional[str] = None,
+):
+    """
+    Numeric return / risk analytics for any set of tickers, without the LLM.
+      - summary: last close, total / annualized return, annualized volatility
+      - correlation: correlation matrix of daily returns
+      - volatility: annualized rolling volatility over `window` days
+      - beta: beta vs an equal-weight FAANG index
+      - drawdown: max and current drawdown from the running peak
+      - distribution: daily return moments, percentiles and histogram
+    `metrics` is a comma-separated subset of the above (default: all).
+    """
+    from google.cloud import bigquery
 
-Write your answer as FIVE clearly separated 'cards' using markdown headings:
+    from .analytics import ALL_METRICS, compute_analytics, price_matrix
 
-Momentum Overview
-- Compare the recent momentum of {t1} vs {t2} using *relative* language.
-- Mention who has stronger short-term trend and whether it is subtle or clearly stronger.
+    symbols = _parse_tickers(tickers)
 
-Overbought / Oversold (RSI)
-- Explain which ticker is closer to the overbought side and which is closer to the oversold side.
-- Use phrases like "closer to the hot zone" or "cooler, with more room to recover".
-- Keep this educational and intuitive.
+    selected = ALL_METRICS
+    if metrics:
+        selected = tuple(m.strip().lower() for m in metrics.split(",") if m.strip())
+        unknown = sorted(set(selected) - set(ALL_METRICS))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown metrics: {', '.join(unknown)}. Choose from: {', '.join(ALL_METRICS)}.",
+            )
 
-Moving Average Trend Check
-- Compare ma_20 vs ma_50 for each stock.
-- State which one has a cleaner bullish alignment (short MA above long MA with some separation) vs a flatter or more neutral trend.
+    days = max(7, min(days, 1825))
+    window = max(2, min(window, days))
 
-Risk & Volatility Snapshot
-- Comment on which stock's recent daily returns appear more volatile vs steadier.
-- Frame this in neutral terms (not good or bad), e.g. "more movement" vs "smoother path".
+    index_tickers = list(TICKER_TO_COMPANY)
+    query_tickers = list(dict.fromkeys(symbols + (index_tickers if "beta" in selected else [])))
 
-Analyst Note (Not Financial Advice)
-- One short paragraph that starts EXACTLY with:
-  "This is not financial advice, but in general analysts may look at momentum, RSI, and moving averages to understand short-term behavior."
-- Do NOT recommend buying, selling, or holding any stock.
+    query = f"""
+        SELECT
+          ticker,
+          trade_date,
+          close
+        FROM `{PROJECT_ID}.{DATASET}.{GOLD_TABLE}`
+        WHERE trade_date >= DATE_SUB(CURRENT_DATE(), INTERVAL @days DAY)
+          AND ticker IN UNNEST(@tickers)
+        ORDER BY trade_date
+        LIMIT {QUERY_BUDGETS["analytics"].max_rows + 1}
+    """
 
-Rules:
-- Do NOT repeat any of the raw numeric values (no exact prices, no 0.0234, no 5.2%).
-- Use only qualitative language: "slightly stronger", "meaningfully higher", "modest underperformance", etc.
-- Keep each card to 2–4 short bullet points or 1–2 short sentences.
-"""
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("days", "INT64", days),
+            bigquery.ArrayQueryParameter("tickers", "STRING", query_tickers),
+        ]
+    )
 
-    try:
-        completion = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a neutral, professional equity analyst. You do not give investment advice.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.6,
+    df = run_query(query, job_config=job_config, endpoint="analytics")
+    if df.empty:
+        raise HTTPException(
+            status_code=404,
+            detail="No data found for those tickers in the selected window.",
         )
-        analysis = completion.choices[0].message.content.strip()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OpenAI error: {str(e)}")
 
-    return {
-        "ticker1": t1,
-        "ticker2": t2,
-        "days": days,
-        "table": summary.to_dict(orient="records"),
-        "analysis": analysis,
-    }
+    dates, prices = price_matrix(df, query_tickers)
+    columns = {t: i for i, t in enumerate(query_tickers)}
+    report = compute_analytics(
+        dates,
+        symbols,
+        prices[:, [columns[t] for t in symbols]],
+        index_prices=prices[:, [columns[t] for t in index_tickers]] if "beta" in selected else None,
+        window=window,
+        metrics=selected,
+    )
+    report["days"] = days
+    return report
 
 
 @app.get("/faang-dashboard")
@@ -687,6 +1027,10 @@ def faang_dashboard(days: int = 30):
     """
     Returns compact metrics for all FAANG names for UI dashboard cards.
     """
+    import numpy as np
+    import pandas as pd
+    from google.cloud import bigquery
+
     days = max(7, min(days, 180))
 
     query = f"""
@@ -701,6 +1045,7 @@ def faang_dashboard(days: int = 30):
         WHERE trade_date >= DATE_SUB(CURRENT_DATE(), INTERVAL @days DAY)
           AND ticker IN ("AAPL", "AMZN", "META", "NFLX", "GOOGL")
         ORDER BY trade_date DESC
+        LIMIT {QUERY_BUDGETS["faang-dashboard"].max_rows + 1}
     """
 
     job_config = bigquery.QueryJobConfig(
@@ -709,7 +1054,7 @@ def faang_dashboard(days: int = 30):
         ]
     )
 
-    df = bq_client.query(query, job_config=job_config).to_dataframe()
+    df = run_query(query, job_config=job_config, endpoint="faang-dashboard")
     if df.empty:
         raise HTTPException(status_code=404, detail="No FAANG data found.")
 
@@ -736,3 +1081,96 @@ def faang_dashboard(days: int = 30):
     }
 
 
+
+
+@app.get("/intraday")
+async def intraday_bars(ticker: str = "AAPL", interval: str = "1m", limit: int = 120):
+    """
+    Recent intraday bars from this worker's in-memory rings (the last one
+    may still be forming). Served on the event loop next to the feed, so
+    it never blocks on BigQuery or yfinance.
+    """
+    symbols = _parse_tickers(ticker)
+    if len(symbols) > 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Pass a single ticker; use /ws/intraday to stream several.",
+        )
+    symbol = symbols[0]
+    _check_interval(interval)
+    limit = max(1, min(limit, MAX_INTRADAY_SNAPSHOT))
+    hub = get_stream_hub()
+    return {
+        "ticker": symbol,
+        "interval": interval,
+        "live": hub.running,
+        "bars": hub.aggregator.snapshot(symbol, interval, limit),
+    }
+
+
+@app.websocket("/ws/intraday")
+async def intraday_stream(
+    websocket: WebSocket,
+    tickers: str = "AAPL,AMZN,META,NFLX,GOOGL",
+    interval: str = "1m",
+    limit: int = 120,
+):
+    """
+    Live intraday bars. Sends one snapshot message with the recent bars per
+    ticker, then a "bar" message whenever a subscribed bar updates
+    ("closed": true once the interval is complete).
+    """
+    try:
+        symbols = _parse_tickers(tickers)
+        _check_interval(interval)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    limit = max(1, min(limit, MAX_INTRADAY_SNAPSHOT))
+
+    await websocket.accept()
+    hub = get_stream_hub()
+    # Subscribe before the snapshot so no update falls in between
+    queue = hub.subscribe((s, interval) for s in symbols)
+
+    async def forward_updates():
+        while True:
+            await websocket.send_text(await queue.get())
+
+    async def receive_until_disconnect():
+        # Incoming messages are ignored; receiving is how a disconnect shows up
+        while True:
+            await websocket.receive_text()
+
+    try:
+        await websocket.send_text(
+            json.dumps(
+                {
+                    "type": "snapshot",
+                    "interval": interval,
+                    "live": hub.running,
+                    "bars": {s: hub.aggregator.snapshot(s, interval, limit) for s in symbols},
+                }
+            )
+        )
+        # Stop as soon as either side ends: a failed send or a disconnect
+        tasks = [
+            asyncio.create_task(forward_updates()),
+            asyncio.create_task(receive_until_disconnect()),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            # asyncio.wait, not gather: gather would replace the server's own
+            # CancelledError on shutdown with a new one
+            await asyncio.wait(tasks)
+            for task in tasks:
+                # Retrieve the outcome so a failed send is not logged as never retrieved
+                if not task.cancelled():
+                    task.exception()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe(queue)
@@ -0,0 +1,250 @@
+"""
+Shared news-processing stage used by the news endpoints.
+
+All company aliases and stock keywords are compiled into one regex
+alternation, so a page of articles is scanned once per article (not once per
+keyword) and matches for every ticker come out of the same pass. The stage
+also filters sources, de-duplicates by normalized URL and title hash, and
+scores relevance.
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Names that count as a mention of each company (case-insensitive)
+COMPANY_ALIASES = {
+    "AAPL": ("Apple",),
+    "AMZN": ("Amazon",),
+    "META": ("Meta", "Facebook"),
+    "NFLX": ("Netflix",),
+    "GOOGL": ("Google", "Alphabet"),
+}
+
+# Only accept these source names from the API
+REPUTED_SOURCES = {
+    "Bloomberg",
+    "Reuters",
+    "The Wall Street Journal",
+    "CNBC",
+    "Financial Times",
+    "MarketWatch",
+    "Yahoo Finance",
+    "Barron’s",
+    "Barron's",
+    "The Motley Fool",
+    "Seeking Alpha",
+    "Investor's Business Daily",
+}
+
+STOCK_KEYWORDS = [
+    "stock",
+    "shares",
+    "earnings",
+    "quarter",
+    "q1",
+    "q2",
+    "q3",
+    "q4",
+    "guidance",
+    "outlook",
+    "revenue",
+    "profit",
+    "loss",
+    "valuation",
+    "price target",
+    "analyst",
+    "dividend",
+]
+
+
+# ===========================
+# MATCHER
+# ===========================
+
+def _trie_regex(terms: Dict[str, str]) -> str:
+    """
+    Build a regex that matches any of `terms` (term -> required suffix),
+    factored as a character trie. Python's re engine tries alternation
+    branches one by one, so sharing prefixes keeps each position cheap.
+    Longer continuations are tried first, so "price target" beats "price".
+    """
+    trie = {}
+    for term, suffix in terms.items():
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = suffix
+    return _trie_node_regex(trie)
+
+
+def _trie_node_regex(node: dict) -> str:
+    end = node.get("")
+    branches = [
+        re.escape(ch) + _trie_node_regex(child)
+        for ch, child in sorted(node.items())
+        if ch
+    ]
+    if not branches:
+        return end
+    if end is None and len(branches) == 1:
+        return branches[0]
+    if end is None:
+        return "(?:" + "|".join(branches) + ")"
+    return "(?:" + "|".join(branches) + "|" + end + ")"
+
+
+class ArticleMatcher:
+    """
+    Compiled matcher over company aliases and stock keywords.
+
+    Company names must match whole words ("Apple's" matches, "metadata"
+    does not); keywords match at the start of a word ("stocks", "losses").
+    """
+
+    def __init__(self, aliases: Dict[str, Iterable[str]], keywords: Iterable[str]):
+        self._term_owner = {}
+        for ticker, names in aliases.items():
+            for name in names:
+                self._term_owner.setdefault(name.lower(), set()).add(ticker)
+        self._keywords = {k.lower() for k in keywords}
+
+        terms = {k: "" for k in self._keywords}
+        terms.update({name: r"\b" for name in self._term_owner})
+        # Text is lower-cased before matching, so no IGNORECASE needed
+        self._findall = re.compile(r"\b" + _trie_regex(terms)).findall
+        self.tickers = tuple(aliases)
+
+    def scan(self, title: str, description: str) -> Tuple[Dict[str, int], int]:
+        """
+        Return ({ticker: relevance}, distinct keyword count) for one article.
+        Only tickers whose company is mentioned appear in the dict.
+        """
+        mentions = {}
+        keywords = set()
+        # Headline mentions weigh more than body mentions
+        for text, weight in ((title, 3), (description, 1)):
+            if not text:
+                continue
+            for term in self._findall(text.lower()):
+                owners = self._term_owner.get(term)
+                if owners:
+                    for ticker in owners:
+                        mentions[ticker] = mentions.get(ticker, 0) + weight
+                if term in self._keywords:
+                    keywords.add(term)
+
+        return (
+            {t: score + len(keywords) for t, score in mentions.items()},
+            len(keywords),
+        )
+
+    def is_stock_related(self, title: str, description: str, ticker: str) -> bool:
+        mentions, keyword_count = self.scan(title, description)
+        return ticker in mentions and keyword_count > 0
+
+
+@lru_cache(maxsize=64)
+def _build_matcher(alias_items: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> ArticleMatcher:
+    return ArticleMatcher(dict(alias_items), STOCK_KEYWORDS)
+
+
+def matcher_for(
+    symbols: Iterable[str],
+    company_names: Optional[Dict[str, str]] = None,
+) -> ArticleMatcher:
+    """
+    Return a (cached) matcher for the given tickers. Tickers without
+    known aliases fall back to their company name, or the symbol itself.
+    """
+    company_names = company_names or {}
+    items = []
+    for symbol in dict.fromkeys(symbols):
+        names = COMPANY_ALIASES.get(symbol) or (company_names.get(symbol, symbol),)
+        items.append((symbol, tuple(names)))
+    return _build_matcher(tuple(items))
+
+
+# ===========================
+# DEDUP
+# ===========================
+
+def normalize_url(url: Optional[str]) -> Optional[str]:
+    """Lower-case host, drop scheme, query string, fragment and trailing slash."""
+    if not url:
+        return None
+    url = url.strip().split("#", 1)[0].split("?", 1)[0]
+    _, sep, rest = url.partition("://")
+    host, _, path = (rest if sep else url).partition("/")
+    host = host.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}/{path.rstrip('/')}"
+
+
+def title_hash(title: Optional[str]) -> Optional[str]:
+    """Hash of the whitespace-collapsed, lower-cased title."""
+    text = " ".join((title or "").lower().split())
+    if not text:
+        return None
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# ===========================
+# PIPELINE
+# ===========================
+
+def process_articles(
+    articles: Iterable[dict],
+    symbols: Iterable[str],
+    limit: Optional[int] = None,
+    company_names: Optional[Dict[str, str]] = None,
+) -> Dict[str, List[dict]]:
+    """
+    Run a page of raw NewsAPI articles through source filtering, dedup and
+    matching in a single pass. Returns {ticker: [article, ...]} for every
+    requested ticker (possibly empty lists), keeping upstream (recency) order
+    and at most `limit` articles per ticker. Each article carries a
+    `relevance` score.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    matcher = matcher_for(symbols, company_names)
+    results = {symbol: [] for symbol in symbols}
+    seen = set()
+
+    for a in articles:
+        title = a.get("title") or ""
+        description = a.get("description") or ""
+        source_name = (a.get("source") or {}).get("name") or ""
+
+        # Only keep from reputable sources (if name is available)
+        if source_name and source_name not in REPUTED_SOURCES:
+            continue
+
+        mentions, keyword_count = matcher.scan(title, description)
+        if not mentions or keyword_count == 0:
+            continue
+
+        keys = [k for k in (normalize_url(a.get("url")), title_hash(title)) if k]
+        if any(k in seen for k in keys):
+            continue
+        seen.update(keys)
+
+        for ticker, relevance in mentions.items():
+            bucket = results[ticker]
+            if limit is not None and len(bucket) >= limit:
+                continue
+            bucket.append(
+                {
+                    "title": title,
+                    "description": description,
+                    "source": source_name,
+                    "url": a.get("url"),
+                    "published_at": a.get("publishedAt"),
+                    "relevance": relevance,
+                }
+            )
+
+    return results
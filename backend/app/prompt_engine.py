@@ -0,0 +1,467 @@
+"""
+Shared prompt engine for every LLM-backed endpoint.
+
+Templates are registered once at import time. Each template is split into:
+  - instructions: static text sent as the system message. It never changes
+    between requests, so OpenAI prompt caching can reuse it as a prefix.
+  - body: the per-request user message, formatted from named placeholders.
+    Placeholders shared across requests (e.g. a cached data block) should
+    come before the ones that vary, so they extend the cached prefix.
+
+Data frames are rendered with compact, deterministic CSV / markdown renderers
+instead of DataFrame.to_string, and token usage is accounted per template.
+"""
+
+import math
+import numbers
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from string import Formatter
+from textwrap import dedent
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    # Only for annotations; pandas is already loaded by any caller with a frame
+    import pandas as pd
+
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+# ===========================
+# TEMPLATES
+# ===========================
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    instructions: str
+    body: str
+    fields: tuple
+    temperature: float = 0.7
+    model: str = DEFAULT_MODEL
+    json_output: bool = False
+
+
+_TEMPLATES: Dict[str, PromptTemplate] = {}
+
+
+def register_template(
+    name: str,
+    instructions: str,
+    body: str,
+    temperature: float = 0.7,
+    model: str = DEFAULT_MODEL,
+    json_output: bool = False,
+) -> PromptTemplate:
+    """
+    Register a template. Instructions are used verbatim (never formatted).
+    Placeholders in the body are parsed once here so rendering only has to
+    check for missing values and call str.format.
+    """
+    instructions = dedent(instructions).strip()
+    body = dedent(body).strip()
+    fields = tuple(
+        sorted({f for _, f, _, _ in Formatter().parse(body) if f})
+    )
+    template = PromptTemplate(
+        name=name,
+        instructions=instructions,
+        body=body,
+        fields=fields,
+        temperature=temperature,
+        model=model,
+        json_output=json_output,
+    )
+    _TEMPLATES[name] = template
+    return template
+
+
+def get_template(name: str) -> PromptTemplate:
+    try:
+        return _TEMPLATES[name]
+    except KeyError:
+        raise KeyError(f"Unknown prompt template: {name}") from None
+
+
+def build_messages(name: str, **values) -> List[Dict[str, str]]:
+    """
+    Return chat messages for a template: the static system prefix first,
+    followed by the per-request user message.
+    """
+    template = get_template(name)
+    missing = [f for f in template.fields if f not in values]
+    if missing:
+        raise ValueError(
+            f"Template '{name}' is missing values for: {', '.join(missing)}"
+        )
+    return [
+        {"role": "system", "content": template.instructions},
+        {"role": "user", "content": template.body.format(**values)},
+    ]
+
+
+# ===========================
+# DATA RENDERERS
+# ===========================
+
+def _format_cell(val, decimals: int, isna) -> str:
+    if val is None or isna(val):
+        return ""
+    # pd.Timestamp is a datetime subclass
+    if isinstance(val, (datetime, date)):
+        return val.isoformat()
+    # numpy floats register as numbers.Real
+    if isinstance(val, numbers.Real) and not isinstance(val, numbers.Integral):
+        if not math.isfinite(val):
+            return ""
+        text = f"{val:.{decimals}f}".rstrip("0").rstrip(".")
+        return "0" if text in ("", "-0") else text
+    return str(val)
+
+
+def _prepare_frame(
+    df: "pd.DataFrame",
+    columns: Optional[Iterable[str]],
+    max_rows: Optional[int],
+) -> "pd.DataFrame":
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    if max_rows is not None:
+        df = df.head(max_rows)
+    # Prune columns that carry no information for the model
+    return df.loc[:, df.notna().any(axis=0)]
+
+
+def _render_rows(df: "pd.DataFrame", decimals: int) -> List[List[str]]:
+    from pandas import isna
+
+    return [
+        [_format_cell(v, decimals, isna) for v in row]
+        for row in df.itertuples(index=False, name=None)
+    ]
+
+
+def render_csv(
+    df: "pd.DataFrame",
+    columns: Optional[Iterable[str]] = None,
+    decimals: int = 4,
+    max_rows: Optional[int] = None,
+) -> str:
+    """
+    Render a frame as compact CSV: rounded floats, no index, empty cells for
+    missing values, and all-null columns dropped.
+    """
+    df = _prepare_frame(df, columns, max_rows)
+    if df.empty:
+        return "(no rows)"
+    lines = [",".join(str(c) for c in df.columns)]
+    lines.extend(",".join(row) for row in _render_rows(df, decimals))
+    return "\n".join(lines)
+
+
+def render_markdown(
+    df: "pd.DataFrame",
+    columns: Optional[Iterable[str]] = None,
+    decimals: int = 4,
+    max_rows: Optional[int] = None,
+) -> str:
+    """
+    Render a frame as a markdown table with the same rules as render_csv.
+    """
+    df = _prepare_frame(df, columns, max_rows)
+    if df.empty:
+        return "(no rows)"
+    header = [str(c) for c in df.columns]
+    lines = [
+        "| " + " | ".join(header) + " |",
+        "|" + "|".join("---" for _ in header) + "|",
+    ]
+    lines.extend(
+        "| " + " | ".join(row) + " |" for row in _render_rows(df, decimals)
+    )
+    return "\n".join(lines)
+
+
+# ===========================
+# TOKEN ACCOUNTING
+# ===========================
+
+_stats_lock = threading.Lock()
+_TOKEN_STATS: Dict[str, Dict[str, int]] = {}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def _record_usage(name: str, messages: List[Dict[str, str]], usage) -> None:
+    estimated = sum(estimate_tokens(m["content"]) for m in messages)
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) or 0
+
+    with _stats_lock:
+        stats = _TOKEN_STATS.setdefault(
+            name,
+            {
+                "calls": 0,
+                "estimated_prompt_tokens": 0,
+                "prompt_tokens": 0,
+                "cached_prompt_tokens": 0,
+                "completion_tokens": 0,
+            },
+        )
+        stats["calls"] += 1
+        stats["estimated_prompt_tokens"] += estimated
+        stats["prompt_tokens"] += prompt_tokens
+        stats["cached_prompt_tokens"] += cached_tokens
+        stats["completion_tokens"] += completion_tokens
+
+
+def get_token_stats() -> Dict[str, Dict[str, int]]:
+    """Snapshot of per-template token usage since process start."""
+    with _stats_lock:
+        return {name: dict(stats) for name, stats in _TOKEN_STATS.items()}
+
+
+# ===========================
+# COMPLETION
+# ===========================
+
+def complete(client, name: str, **values) -> str:
+    """
+    Render a registered template, call the chat completions API and return
+    the stripped answer text. API errors propagate to the caller.
+    Templates registered with json_output=True request a JSON object reply.
+    """
+    template = get_template(name)
+    messages = build_messages(name, **values)
+    kwargs = {}
+    if template.json_output:
+        kwargs["response_format"] = {"type": "json_object"}
+    completion = client.chat.completions.create(
+        model=template.model,
+        messages=messages,
+        temperature=template.temperature,
+        **kwargs,
+    )
+    _record_usage(name, messages, getattr(completion, "usage", None))
+    return completion.choices[0].message.content.strip()
+
+
+# ===========================
+# REGISTERED TEMPLATES
+# ===========================
+
+register_template(
+    "ask",
+    instructions="""
+    You are a clear, concise, neutral stock analyst. You do not give investment advice.
+    You focus on FAANG stocks
+    (Apple - AAPL, Amazon - AMZN, Meta - META, Netflix - NFLX, Google - GOOGL).
+
+    You will receive recent daily data from the FAANG gold table as CSV,
+    followed by a user question.
+
+    Columns:
+    - ticker: stock symbol
+    - trade_date: date
+    - close: closing price
+    - daily_return: day-over-day return
+    - cumulative_return: compounded return
+    - rsi_14: 14-day RSI
+    - ma_20, ma_50: moving averages
+
+    Task:
+    - Answer the user's question in 2–3 short paragraphs.
+    - Focus on trends, momentum, and risk.
+    - If the user mentions specific tickers, focus on those.
+    - Do not invent exact numbers; speak qualitatively.
+    - Do NOT give explicit investment advice.
+    """,
+    # The data block is the same for every question while the query cache
+    # holds it, so it goes first: instructions + data (~1.5k tokens) clear
+    # the 1024-token minimum for OpenAI prompt caching, the question does not.
+    body="""
+    Recent daily data (preview):
+    {data}
+
+    User question:
+    {question}
+    """,
+    temperature=0.7,
+)
+
+register_template(
+    "explain_result",
+    instructions="""
+    You are a friendly, clear stock market AI assistant.
+
+    You will receive a user question and the first few rows of a query result as CSV.
+
+    Explain, in a concise and conversational tone:
+    - What is happening with the stock(s)
+    - Any visible trends (uptrend, downtrend, sideways)
+    - Any interesting RSI, moving average, or MACD-style signals if they are visible
+    - Keep it understandable for a non-expert.
+    """,
+    body="""
+    The user asked:
+    {question}
+
+    Here is the data you may use:
+    {data}
+    """,
+    temperature=0.7,
+)
+
+register_template(
+    "generate_sql",
+    instructions="""
+    You generate only SQL for BigQuery.
+
+    Generate a valid BigQuery SQL query (no comments, no explanations).
+
+    Use ONLY the table and columns described below:
+
+    Table: faang-stock-analytics.faang_dataset.gold
+    Columns:
+    - ticker (STRING)
+    - trade_date (DATE)
+    - open, high, low, close (FLOAT)
+    - total_volume (INTEGER)
+    - avg_ma_10, ma_20, ma_50 (FLOAT)
+    - avg_return_1h, daily_return, cumulative_return (FLOAT)
+    - rsi_14 (FLOAT)
+    - bollinger_upper, bollinger_lower (FLOAT)
+    - macd_line, signal_line, macd_histogram (FLOAT)
+    """,
+    body="""
+    The query should answer this question:
+    {question}
+    """,
+    temperature=0,
+)
+
+register_template(
+    "news_sentiment",
+    instructions="""
+    You are a neutral news sentiment analyst. You summarize stock market news
+    objectively and mention the outlets you reference.
+
+    You will receive recent *stock/finance* headlines for one company
+    from reputable business/finance outlets.
+
+    Tasks:
+    - Summarize the overall sentiment (e.g., mostly positive, mostly negative, or mixed).
+    - Explicitly mention a few of the sources by name (for example, "According to Bloomberg and CNBC...").
+    - Highlight any recurring stock-related themes (earnings beats/misses, guidance, analyst rating changes, regulation, etc.).
+    - Keep it short: 2–3 paragraphs.
+    - Do NOT give trading or investment advice.
+    """,
+    body="""
+    Company: {company} ({symbol})
+
+    Headlines:
+    {headlines}
+    """,
+    temperature=0.4,
+)
+
+register_template(
+    "compare_stocks",
+    instructions="""
+    You are a neutral, professional equity analyst. You do not give investment advice.
+
+    Your job is to produce an Apple-style card layout in MARKDOWN only.
+    Do NOT include JSON, just headings and bullet points / short sentences.
+
+    You will receive two FAANG tickers, a lookback window, a compact
+    per-ticker summary table (one row per ticker) and a sample of recent
+    daily rows, both as CSV.
+
+    Columns:
+    - last_close, avg_daily_return, last_cumulative_return
+    - last_rsi (rsi_14)
+    - last_ma20 (ma_20), last_ma50 (ma_50)
+    - daily_return and cumulative_return show recent momentum
+    - rsi_14 indicates overbought/oversold tendencies
+    - ma_20 vs ma_50 describes short vs medium-term trend
+
+    Write your answer as FIVE clearly separated 'cards' using markdown headings:
+
+    Momentum Overview
+    - Compare the recent momentum of the two tickers using *relative* language.
+    - Mention who has stronger short-term trend and whether it is subtle or clearly stronger.
+
+    Overbought / Oversold (RSI)
+    - Explain which ticker is closer to the overbought side and which is closer to the oversold side.
+    - Use phrases like "closer to the hot zone" or "cooler, with more room to recover".
+    - Keep this educational and intuitive.
+
+    Moving Average Trend Check
+    - Compare ma_20 vs ma_50 for each stock.
+    - State which one has a cleaner bullish alignment (short MA above long MA with some separation) vs a flatter or more neutral trend.
+
+    Risk & Volatility Snapshot
+    - Comment on which stock's recent daily returns appear more volatile vs steadier.
+    - Frame this in neutral terms (not good or bad), e.g. "more movement" vs "smoother path".
+
+    Analyst Note (Not Financial Advice)
+    - One short paragraph that starts EXACTLY with:
+      "This is not financial advice, but in general analysts may look at momentum, RSI, and moving averages to understand short-term behavior."
+    - Do NOT recommend buying, selling, or holding any stock.
+
+    Rules:
+    - Do NOT repeat any of the raw numeric values (no exact prices, no 0.0234, no 5.2%).
+    - Use only qualitative language: "slightly stronger", "meaningfully higher", "modest underperformance", etc.
+    - Keep each card to 2–4 short bullet points or 1–2 short sentences.
+    """,
+    body="""
+    Comparing: {t1} vs {t2}
+    Lookback window: last {days} trading days
+
+    Per-ticker summary:
+    {summary}
+
+    Sample of recent daily rows:
+    {preview}
+    """,
+    temperature=0.6,
+)
+
+register_template(
+    "news_sentiment_batch",
+    instructions="""
+    You are a neutral news sentiment analyst. You summarize stock market news
+    objectively and mention the outlets you reference.
+
+    You will receive a numbered list of recent *stock/finance* headlines from
+    reputable business/finance outlets, followed by a list of tickers. Each
+    ticker lists the headline numbers that are about that company. A headline
+    may be relevant to more than one ticker.
+
+    For EACH ticker, using only its listed headlines:
+    - Classify the overall sentiment as one of: "positive", "negative", "mixed", "neutral".
+    - Write a short summary (1–2 paragraphs) that mentions a few of the sources by name
+      and highlights recurring stock-related themes (earnings, guidance, analyst
+      rating changes, regulation, etc.).
+    - Do NOT give trading or investment advice.
+
+    Reply with a single JSON object keyed by ticker symbol, for example:
+    {"AAPL": {"sentiment": "mixed", "summary": "..."}}
+    """,
+    body="""
+    Headlines:
+    {headlines}
+
+    Tickers:
+    {tickers}
+    """,
+    temperature=0.4,
+    json_output=True,
+)
@@ -0,0 +1,72 @@
+"""
+Lazy, thread-safe providers for expensive clients.
+
+Heavy libraries (pandas, google-cloud-bigquery, openai) and the clients
+built on them are only imported / constructed the first time they are
+needed, so the app can start serving (e.g. /health) immediately and
+importing it does not require cloud credentials.
+"""
+
+import functools
+import importlib
+import threading
+from typing import Callable, Iterable, TypeVar
+
+
+T = TypeVar("T")
+
+
+def lazy_singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Decorate a zero-argument factory so it runs at most once per process,
+    even when first called from several threads at the same time.
+    The returned provider has a `reset()` method to drop the cached value.
+    """
+    lock = threading.Lock()
+    state = {}
+
+    @functools.wraps(factory)
+    def provider() -> T:
+        # Fast path without the lock once the value exists
+        if "value" in state:
+            return state["value"]
+        with lock:
+            if "value" not in state:
+                state["value"] = factory()
+            return state["value"]
+
+    def reset() -> None:
+        with lock:
+            state.pop("value", None)
+
+    provider.reset = reset
+    return provider
+
+
+def warm_up(modules: Iterable[str] = (), providers: Iterable[Callable] = ()) -> None:
+    """
+    Import modules and build clients ahead of the first request.
+    Failures are logged, not raised: the request path will retry lazily.
+    """
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Warm-up import of {name} failed: {e}")
+    for provider in providers:
+        try:
+            provider()
+        except Exception as e:
+            print(f"Warm-up of {getattr(provider, '__name__', provider)} failed: {e}")
+
+
+def start_warm_up(modules: Iterable[str] = (), providers: Iterable[Callable] = ()) -> threading.Thread:
+    """Run warm_up in a daemon thread so startup is not blocked on it."""
+    thread = threading.Thread(
+        target=warm_up,
+        args=(list(modules), list(providers)),
+        name="warm-up",
+        daemon=True,
+    )
+    thread.start()
+    return thread
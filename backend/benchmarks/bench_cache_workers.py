@@ -0,0 +1,98 @@
+"""
+Cache hit rates across worker processes: per-process memory vs shared Redis.
+
+A fixed budget of requests over a skewed (Zipf-like) key space is split
+across W worker processes, the way gunicorn spreads traffic. Every miss
+costs one simulated upstream call (BigQuery / OpenAI). With per-process
+caches each worker warms its own copy, so hit rate drops as W grows; with
+the shared backend it stays flat.
+
+Run from the backend directory:
+    python -m benchmarks.bench_cache_workers [--redis-url redis://host:6379/0]
+
+Without --redis-url a fakeredis TCP server is started in-process
+(requires `pip install fakeredis`).
+"""
+
+import argparse
+import multiprocessing
+import random
+import threading
+import time
+
+from app.cache import MemoryCache, RedisCache, make_key
+
+
+def worker(args) -> tuple:
+    backend, redis_url, prefix, seed, n_requests, n_keys, miss_ms = args
+    if backend == "memory":
+        cache = MemoryCache(max_entries=n_keys)
+    else:
+        cache = RedisCache(url=redis_url, prefix=prefix)
+
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(n_keys)]
+    keys = rng.choices(range(n_keys), weights=weights, k=n_requests)
+
+    upstream_calls = 0
+    for k in keys:
+        key = make_key("bench", k)
+        if cache.get(key) is None:
+            upstream_calls += 1
+            time.sleep(miss_ms / 1000)
+            cache.set(key, {"rows": k}, ttl=600)
+    stats = cache.stats()
+    return stats["hits"], stats["misses"], upstream_calls
+
+
+def run(backend: str, redis_url: str, workers: int, total: int, n_keys: int, miss_ms: float) -> dict:
+    prefix = f"bench-{backend}-{workers}-{time.time_ns()}"
+    per_worker = total // workers
+    jobs = [(backend, redis_url, prefix, seed, per_worker, n_keys, miss_ms) for seed in range(workers)]
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.map(worker, jobs)
+    elapsed = time.perf_counter() - start
+    hits = sum(r[0] for r in results)
+    misses = sum(r[1] for r in results)
+    return {
+        "hit_rate": hits / (hits + misses),
+        "upstream_calls": sum(r[2] for r in results),
+        "seconds": elapsed,
+    }
+
+
+def start_fake_redis() -> str:
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return f"redis://{host}:{port}/0"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache hit rates across worker processes")
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--requests", type=int, default=4000, help="total requests across all workers")
+    parser.add_argument("--keys", type=int, default=300)
+    parser.add_argument("--miss-ms", type=float, default=2.0, help="simulated upstream latency per miss")
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+
+    redis_url = args.redis_url or start_fake_redis()
+    worker_counts = [int(w) for w in args.workers.split(",")]
+
+    print(f"{args.requests} requests over {args.keys} keys, {args.miss_ms} ms per upstream call")
+    print(f"{'workers':>7} | {'backend':>7} | {'hit rate':>8} | {'upstream calls':>14} | {'wall s':>6}")
+    for workers in worker_counts:
+        for backend in ("memory", "redis"):
+            r = run(backend, redis_url, workers, args.requests, args.keys, args.miss_ms)
+            print(
+                f"{workers:>7} | {backend:>7} | {r['hit_rate']:>8.1%} | "
+                f"{r['upstream_calls']:>14} | {r['seconds']:>6.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Intraday fan-out throughput: one shared payload vs a copy per subscriber.
+
+Synthetic ticks for a few tickers are written to a CSV and replayed (no
+sleeping) through BarAggregator + StreamHub while S subscribers drain
+their queues. The shared hub serializes each bar update once; the
+baseline serializes it again for every subscriber, as a naive per-client
+loop would.
+
+Run from the backend directory:
+    python -m benchmarks.bench_intraday_fanout [--ticks 20000] [--subscribers 1,10,100,500]
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+
+from app.intraday import INTERVALS, BarAggregator, BarRing, ReplayFileSource, StreamHub
+
+
+TICKERS = ("AAPL", "AMZN", "META", "NFLX", "GOOGL")
+
+
+class PerClientHub(StreamHub):
+    """Baseline: builds the message separately for each subscriber."""
+
+    def publish(self, events) -> None:
+        for ticker, interval, bar, closed in events:
+            for queue in self._subscribers.get((ticker, interval), ()):
+                message = json.dumps(
+                    {"type": "bar", "ticker": ticker, "interval": interval, "closed": closed, "bar": bar}
+                )
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(message)
+
+
+def write_ticks(path: str, n_ticks: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    prices = {t: 100.0 + 50 * i for i, t in enumerate(TICKERS)}
+    ts = 1_700_000_000.0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ticker", "timestamp", "price", "volume"])
+        for _ in range(n_ticks):
+            ticker = rng.choice(TICKERS)
+            prices[ticker] *= 1 + rng.gauss(0, 0.0005)
+            ts += rng.expovariate(1 / 0.5)
+            writer.writerow([ticker, f"{ts:.3f}", f"{prices[ticker]:.4f}", rng.randint(1, 500)])
+
+
+async def run(hub_cls, path: str, subscribers: int) -> dict:
+    hub = hub_cls(BarAggregator(INTERVALS, ring_size=720), queue_size=1024)
+    received = [0]
+
+    async def drain(queue):
+        while True:
+            await queue.get()
+            received[0] += 1
+
+    consumers = []
+    for i in range(subscribers):
+        ticker = TICKERS[i % len(TICKERS)]
+        queue = hub.subscribe([(ticker, "1m")])
+        consumers.append(asyncio.create_task(drain(queue)))
+
+    start = time.perf_counter()
+    await hub.run(ReplayFileSource(path, speed=0))
+    await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    for task in consumers:
+        task.cancel()
+    return {"seconds": elapsed, "delivered": received[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intraday fan-out throughput")
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--subscribers", default="1,10,100,500")
+    args = parser.parse_args()
+
+    ring = BarRing(720)
+    ring_bytes = sum(col.itemsize * len(col) for col in ring._cols)
+    print(f"BarRing: {ring_bytes / ring.capacity:.0f} bytes per bar ({ring_bytes:,} bytes for {ring.capacity} bars)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ticks.csv")
+        write_ticks(path, args.ticks)
+
+        print(f"{args.ticks} ticks over {len(TICKERS)} tickers, 1m subscriptions")
+        print(f"{'subs':>5} | {'shared s':>8} | {'per-client s':>12} | {'speedup':>7} | {'delivered':>10}")
+        for subscribers in (int(s) for s in args.subscribers.split(",")):
+            shared = asyncio.run(run(StreamHub, path, subscribers))
+            baseline = asyncio.run(run(PerClientHub, path, subscribers))
+            print(
+                f"{subscribers:>5} | {shared['seconds']:>8.2f} | {baseline['seconds']:>12.2f} | "
+                f"{baseline['seconds'] / shared['seconds']:>6.1f}x | {shared['delivered']:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
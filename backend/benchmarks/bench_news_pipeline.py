@@ -0,0 +1,128 @@
+"""
+Microbenchmark: filter a large page of synthetic articles for every
+ticker with the compiled news pipeline vs. the old per-ticker,
+per-keyword substring scan.
+
+The old scan costs O(tickers x keywords) substring searches per article,
+the compiled matcher one regex pass per article, so the benchmark is run
+for the FAANG set and for larger synthetic ticker universes.
+
+Run from the backend directory:
+    python -m benchmarks.bench_news_pipeline [n_articles]
+"""
+
+import random
+import sys
+import time
+
+from app.news_pipeline import (
+    COMPANY_ALIASES,
+    REPUTED_SOURCES,
+    STOCK_KEYWORDS,
+    process_articles,
+)
+
+FAANG = {"AAPL": "Apple", "AMZN": "Amazon", "META": "Meta", "NFLX": "Netflix", "GOOGL": "Google"}
+FILLER = (
+    "markets investors today week report said company new plan deal growth "
+    "consumer device cloud streaming advertising platform users chip"
+).split()
+SOURCES = sorted(REPUTED_SOURCES) + ["Some Blog", "Press Release Wire"]
+
+
+def synthetic_companies(n: int, seed: int = 3) -> dict:
+    """FAANG plus made-up companies, up to n tickers in total."""
+    rng = random.Random(seed)
+    companies = dict(FAANG)
+    syllables = ["ver", "tal", "no", "qui", "dex", "ora", "lum", "bri", "sto", "zen"]
+    while len(companies) < n:
+        name = "".join(rng.choices(syllables, k=3)).capitalize()
+        companies[name[:4].upper() + str(len(companies))] = name
+    return companies
+
+
+def synthetic_articles(n: int, companies: dict, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    names = list(companies.values()) + [
+        name for aliases in COMPANY_ALIASES.values() for name in aliases
+    ]
+    articles = []
+    for i in range(n):
+        words = rng.choices(FILLER, k=12)
+        words.insert(rng.randrange(len(words)), rng.choice(names))
+        if rng.random() < 0.6:
+            words.insert(rng.randrange(len(words)), rng.choice(STOCK_KEYWORDS))
+        title = " ".join(words[:8]).capitalize()
+        description = " ".join(words[8:] + rng.choices(FILLER, k=25))
+        # ~10% re-published duplicates
+        url_id = i if rng.random() > 0.1 else rng.randrange(max(i, 1))
+        articles.append(
+            {
+                "title": title,
+                "description": description,
+                "source": {"name": rng.choice(SOURCES)},
+                "url": f"https://www.example.com/news/{url_id}",
+                "publishedAt": f"2025-01-01T00:{i % 60:02d}:00Z",
+            }
+        )
+    return articles
+
+
+def legacy_filter(articles: list, companies: dict) -> dict:
+    """The original per-ticker loop: one substring scan per keyword."""
+
+    def is_stock_related(title, description, company):
+        text = f"{title or ''} {description or ''}".lower()
+        if company.lower() not in text:
+            return False
+        return any(k in text for k in STOCK_KEYWORDS)
+
+    results = {}
+    for symbol, company in companies.items():
+        kept = []
+        for a in articles:
+            source_name = (a.get("source") or {}).get("name") or ""
+            if source_name and source_name not in REPUTED_SOURCES:
+                continue
+            if is_stock_related(a.get("title"), a.get("description"), company):
+                kept.append(a)
+        results[symbol] = kept
+    return results
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(n_articles: int, n_tickers: int) -> None:
+    companies = synthetic_companies(n_tickers)
+    articles = synthetic_articles(n_articles, companies)
+    symbols = list(companies)
+
+    legacy = best_of(lambda: legacy_filter(articles, companies))
+    compiled = best_of(lambda: process_articles(articles, symbols, None, companies))
+
+    legacy_hits = sum(len(v) for v in legacy_filter(articles, companies).values())
+    compiled_hits = sum(
+        len(v) for v in process_articles(articles, symbols, None, companies).values()
+    )
+
+    print(f"articles: {n_articles}, tickers: {len(symbols)}")
+    print(f"  legacy per-ticker scan : {legacy * 1000:8.1f} ms  ({legacy_hits} matches, no dedup)")
+    print(f"  compiled single pass   : {compiled * 1000:8.1f} ms  ({compiled_hits} matches, deduped)")
+    print(f"  speedup                : {legacy / compiled:8.2f}x")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for n_tickers in (5, 25, 100):
+        run(n, n_tickers)
+
+
+if __name__ == "__main__":
+    main()
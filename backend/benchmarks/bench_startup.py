@@ -0,0 +1,104 @@
+"""
+Startup-time benchmark for the API module.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter
+(so nothing is cached in-process), reports the total import time, the
+slowest direct imports, and whether any of the heavy modules that are
+supposed to load lazily were imported at startup.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup [--runs N] [--budget-ms MS]
+
+Exits non-zero if the median import time exceeds the budget or a heavy
+module is imported eagerly, so it can gate CI.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported by `import app.main`
+LAZY_MODULES = ("pandas", "numpy", "google.cloud.bigquery", "openai", "requests")
+
+
+def import_profile(module: str) -> list:
+    """
+    Return [(name, cumulative_us, depth), ...] in importtime order (children
+    before their parent) for one cold import of `module`.
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    profile = []
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, raw_name = line[len("import time:"):].split("|")
+        name = raw_name.strip()
+        # importtime indents nested imports by two spaces per level
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        profile.append((name, int(cumulative_us), depth))
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    profiles = [import_profile(args.module) for _ in range(args.runs)]
+    totals = [
+        next(cum for name, cum, depth in p if name == args.module and depth == 0) / 1000
+        for p in profiles
+    ]
+    median = statistics.median(totals)
+    last = profiles[-1]
+
+    print(f"import {args.module}: median {median:.1f} ms over {args.runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f})")
+
+    # Direct children are the depth-1 lines right above the module's own line
+    end = next(i for i, (name, _, depth) in enumerate(last) if name == args.module and depth == 0)
+    direct = []
+    for name, cum, depth in reversed(last[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            direct.append((name, cum))
+    direct.sort(key=lambda item: item[1], reverse=True)
+    print(f"\nslowest imports made directly by {args.module} (last run):")
+    for name, cum in direct[: args.top]:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+
+    loaded = {name for name, _, _ in last}
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    print()
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+    else:
+        print(f"ok: none of {', '.join(LAZY_MODULES)} imported at startup")
+
+    if median > args.budget_ms:
+        print(f"FAIL: median {median:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+    if eager or median > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Production server config: gunicorn managing uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Each worker is a separate process with its own lazily-built clients, so
+per-process caching (CACHE_BACKEND=memory) does the same BigQuery / OpenAI
+work once per worker. Set CACHE_BACKEND=redis and REDIS_URL to share query
+results, LLM answers and news sentiment across workers and instances, and to
+let only one worker refresh each ticker's news per interval. The SQLite
+article store (NEWS_DB_PATH) is a file shared by all workers in a container.
+
+Environment:
+    PORT                 listen port (Cloud Run sets this), default 8080
+    WEB_CONCURRENCY      worker processes, default 2 per CPU (max 8)
+    GUNICORN_TIMEOUT     worker timeout in seconds, default 120
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", min(2 * multiprocessing.cpu_count(), 8)))
+
+# Slow LLM calls run in FastAPI's threadpool; keep the timeout above them
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth from pandas / caches
+max_requests = 2000
+max_requests_jitter = 200
+
+# Do not preload: clients (gRPC / HTTP pools) must be created after fork,
+# which the lazy providers in app.main already guarantee.
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,72 @@
+"""
+Vectorized analytics checked against pandas on NaN-holed data.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analytics import compute_analytics, correlation_matrix, rolling_volatility, simple_returns
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(7)
+    r = rng.normal(0, 0.01, size=(120, 4))
+    r[:, 1] += 0.8 * r[:, 0]
+    r[:, 3] -= 0.5 * r[:, 2]
+    # Holes in different places for different tickers
+    r[rng.random(r.shape) < 0.1] = np.nan
+    r[:15, 2] = np.nan  # late listing
+    return r
+
+
+def test_correlation_matches_pandas_pairwise(returns):
+    expected = pd.DataFrame(returns).corr().to_numpy()
+    np.testing.assert_allclose(correlation_matrix(returns), expected, rtol=1e-10, atol=1e-12)
+
+
+def test_all_nan_ticker_blanks_only_its_row_and_column(returns):
+    returns[:, 2] = np.nan
+    corr = correlation_matrix(returns)
+
+    assert np.isnan(corr[2, :]).all() and np.isnan(corr[:, 2]).all()
+    others = np.delete(np.delete(corr, 2, axis=0), 2, axis=1)
+    assert np.isfinite(others).all()
+    np.testing.assert_allclose(np.diag(others), 1.0)
+
+
+@pytest.mark.parametrize("window", [2, 5, 20])
+def test_rolling_volatility_matches_pandas(returns, window):
+    expected = (
+        pd.DataFrame(returns).rolling(window, min_periods=2).std().to_numpy()[window - 1:]
+        * np.sqrt(252)
+    )
+    np.testing.assert_allclose(rolling_volatility(returns, window), expected, rtol=1e-10, atol=1e-12)
+
+
+def test_rolling_volatility_shorter_than_window():
+    assert rolling_volatility(np.zeros((3, 2)), 5).shape == (0, 2)
+
+
+def test_report_with_unknown_ticker_keeps_other_correlations():
+    dates = [f"2026-01-{d:02d}" for d in range(1, 31)]
+    prices = np.column_stack(
+        [
+            100 * np.cumprod(1 + np.linspace(-0.01, 0.01, 30)),
+            50 * np.cumprod(1 + np.sin(np.arange(30)) / 100),
+            np.full(30, np.nan),
+        ]
+    )
+
+    report = compute_analytics(dates, ["AAPL", "AMZN", "XXX"], prices, window=5)
+
+    matrix = report["correlation"]["matrix"]
+    assert matrix[0][1] is not None and matrix[0][1] == matrix[1][0]
+    assert matrix[2] == [None, None, None]
+    assert report["summary"]["XXX"]["last_close"] is None
+    expected = pd.DataFrame(simple_returns(prices)[:, :2]).corr().iloc[0, 1]
+    assert matrix[0][1] == pytest.approx(expected)
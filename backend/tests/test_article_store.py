@@ -0,0 +1,136 @@
+"""
+ArticleStore dedup and keyset pagination, on an in-memory database.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+import pytest
+
+from app.article_store import ArticleStore
+
+
+def article(url, title, published_at, relevance=1):
+    return {
+        "title": title,
+        "description": "",
+        "source": "Reuters",
+        "url": url,
+        "published_at": published_at,
+        "relevance": relevance,
+    }
+
+
+@pytest.fixture
+def store():
+    return ArticleStore(":memory:")
+
+
+def walk(store, ticker, limit):
+    """All pages of a ticker's articles, following next_cursor."""
+    pages, cursor = [], None
+    while True:
+        page, cursor = store.query(ticker, limit, cursor=cursor)
+        pages.append([a["url"] for a in page])
+        if cursor is None:
+            return pages
+
+
+def test_same_url_is_retagged_not_duplicated(store):
+    assert store.add_articles({"AAPL": [article("https://www.a.com/x/", "Apple stock", "2026-01-05T10:00:00Z")]}) == 1
+    assert store.add_articles({"META": [article("https://a.com/x?utm=1", "Other title", "2026-01-06T10:00:00Z", 3)]}) == 0
+
+    aapl, _ = store.query("AAPL")
+    meta, _ = store.query("META")
+    assert [a["url"] for a in aapl] == [a["url"] for a in meta] == ["https://www.a.com/x/"]
+    assert meta[0]["published_at"] == "2026-01-05T10:00:00Z"
+    assert meta[0]["relevance"] == 3
+
+
+def test_same_title_within_window_is_a_syndicated_copy(store):
+    title = "Apple stock: what to watch this week"
+    assert store.add_articles({"AAPL": [article("https://a.com/1", title, "2026-01-05T10:00:00Z")]}) == 1
+    assert store.add_articles({"AAPL": [article("https://b.com/1", title, "2026-01-05T20:00:00Z")]}) == 0
+
+
+def test_recurring_headline_on_a_later_date_is_a_new_article(store):
+    title = "Apple stock: what to watch this week"
+    store.add_articles({"AAPL": [article("https://a.com/jan", title, "2026-01-05T10:00:00Z")]})
+    assert store.add_articles({"AAPL": [article("https://a.com/mar", title, "2026-03-02T10:00:00Z")]}) == 1
+
+    latest, _ = store.query("AAPL", limit=1)
+    assert (latest[0]["url"], latest[0]["published_at"]) == ("https://a.com/mar", "2026-03-02T10:00:00Z")
+
+
+def test_articles_without_url_dedup_on_title_and_date(store):
+    assert store.add_articles({"AAPL": [article(None, "Apple shares rise", "2026-01-05T10:00:00Z")]}) == 1
+    assert store.add_articles({"AAPL": [article(None, "Apple shares rise", "2026-01-05T11:00:00Z")]}) == 0
+    assert store.add_articles({"AAPL": [article(None, "Apple shares rise", "2026-02-05T11:00:00Z")]}) == 1
+
+
+def test_cursor_paging_visits_every_article_once_newest_first(store):
+    store.add_articles(
+        {
+            "AAPL": [
+                article(f"https://a.com/{i}", f"Apple story {i}", f"2026-01-{i + 1:02d}T10:00:00Z")
+                for i in range(5)
+            ]
+            # Same timestamp: ties are broken by id
+            + [article("https://a.com/tie", "Apple tie", "2026-01-03T10:00:00Z")]
+        }
+    )
+
+    pages = walk(store, "AAPL", limit=2)
+    assert pages == [
+        ["https://a.com/4", "https://a.com/3"],
+        ["https://a.com/tie", "https://a.com/2"],
+        ["https://a.com/1", "https://a.com/0"],
+    ]
+
+
+def test_cursor_paging_with_null_published_at(store):
+    store.add_articles(
+        {
+            "AAPL": [
+                article("https://a.com/new", "Apple new", "2026-01-02T10:00:00Z"),
+                article("https://a.com/undated-1", "Apple undated one", None),
+                article("https://a.com/old", "Apple old", "2026-01-01T10:00:00Z"),
+                article("https://a.com/undated-2", "Apple undated two", None),
+            ]
+        }
+    )
+
+    pages = walk(store, "AAPL", limit=1)
+    # Undated articles sort last, newest id first, and are not skipped or repeated
+    assert [url for page in pages for url in page] == [
+        "https://a.com/new",
+        "https://a.com/old",
+        "https://a.com/undated-2",
+        "https://a.com/undated-1",
+    ]
+
+
+def test_search_filters_and_pages(store):
+    store.add_articles(
+        {
+            "AAPL": [
+                article(f"https://a.com/{i}", f"Apple {'earnings' if i % 2 else 'product'} {i}", f"2026-01-0{i + 1}T10:00:00Z")
+                for i in range(6)
+            ]
+        }
+    )
+
+    page, cursor = store.query("AAPL", limit=2, search="earnings")
+    assert [a["url"] for a in page] == ["https://a.com/5", "https://a.com/3"]
+    page, cursor = store.query("AAPL", limit=2, cursor=cursor, search="earnings")
+    assert [a["url"] for a in page] == ["https://a.com/1"]
+    assert cursor is None
+
+
+def test_watermark_only_moves_forward(store):
+    store.mark_fetched("AAPL", "2026-01-05T10:00:00Z")
+    store.mark_fetched("AAPL", "2026-01-04T10:00:00Z")
+    store.mark_fetched("AAPL", None)
+    watermark, last_fetch_at = store.fetch_state("AAPL")
+    assert watermark == "2026-01-05T10:00:00Z"
+    assert last_fetch_at is not None
@@ -0,0 +1,84 @@
+"""
+Cache backends. RedisCache runs against fakeredis (as in
+benchmarks/bench_cache_workers.py) and must round-trip values without pickle.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.cache import MemoryCache, RedisCache, make_key
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_cache():
+    return RedisCache(client=fakeredis.FakeRedis(), prefix="test")
+
+
+def test_dataframe_round_trip(redis_cache):
+    df = pd.DataFrame(
+        {
+            "ticker": ["AAPL", "AMZN", "META"],
+            "trade_date": [dt.date(2026, 1, 2), dt.date(2026, 1, 5), dt.date(2026, 1, 6)],
+            "close": [187.5, np.nan, 612.25],
+            "total_volume": pd.array([100, None, 300], dtype="Int64"),
+        }
+    )
+    redis_cache.set("df", df, ttl=60)
+    out = redis_cache.get("df")
+
+    pd.testing.assert_frame_equal(out, df, check_dtype=False)
+    assert out["total_volume"].dtype == "Int64"
+    assert isinstance(out["trade_date"].iloc[0], dt.date)
+    assert out["trade_date"].iloc[0].isoformat() == "2026-01-02"
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["An LLM answer", {"ticker": "AAPL", "articles": [{"title": "t", "relevance": 3}], "sentiment": None}, 123456789],
+)
+def test_plain_value_round_trip(redis_cache, value):
+    redis_cache.set("k", value, ttl=60)
+    assert redis_cache.get("k") == value
+
+
+def test_unknown_payload_is_a_miss(redis_cache):
+    # e.g. a pickle written by an older version, or by someone else
+    redis_cache._client.set("test:k", b"\x80\x04K\x01.")
+    assert redis_cache.get("k", "default") == "default"
+    assert redis_cache.stats()["misses"] == 1
+
+
+def test_unserializable_value_is_not_stored(redis_cache):
+    redis_cache.set("k", object(), ttl=60)
+    assert redis_cache.get("k") is None
+
+
+def test_add_is_a_lease(redis_cache):
+    assert redis_cache.add("lease", 1, ttl=60)
+    assert not redis_cache.add("lease", 2, ttl=60)
+    assert redis_cache.get("lease") == 1
+
+
+def test_memory_cache_lru_and_ttl():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)  # evicts b, the least recently used
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    cache.set("short", 1, ttl=-1)
+    assert cache.get("short") is None
+
+
+def test_make_key_is_stable():
+    assert make_key("bq", "SELECT 1", [{"b": 1, "a": 2}]) == make_key("bq", "SELECT 1", [{"a": 2, "b": 1}])
+    assert make_key("bq", "SELECT 1") != make_key("llm", "SELECT 1")
@@ -0,0 +1,163 @@
+"""
+Intraday aggregation and fan-out, driven by the replay feed.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.intraday import BarAggregator, BarRing, PriceUpdate, ReplayFileSource, StreamHub
+
+
+T0 = 1_699_999_200  # aligned to the hour
+
+# (offset seconds, price, volume)
+TICKS = [
+    (0, 10, 1),
+    (30, 12, 2),
+    (61, 9, 3),
+    (299, 11, 4),
+    (300, 15, 5),
+    (3600, 20, 6),
+]
+
+
+def write_replay(path, ticks=TICKS, ticker="AAPL"):
+    lines = ["ticker,timestamp,price,volume"]
+    lines += [f"{ticker},{T0 + offset},{price},{volume}" for offset, price, volume in ticks]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def ohlcv(bar):
+    return (bar["ts"] - T0, bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"])
+
+
+async def replay_into(hub, path, **kwargs):
+    await hub.run(ReplayFileSource(path, speed=0, **kwargs))
+
+
+def test_replay_aggregates_1m_5m_1h_bars(tmp_path):
+    hub = StreamHub(BarAggregator())
+    asyncio.run(replay_into(hub, write_replay(tmp_path / "ticks.csv")))
+    snapshot = hub.aggregator.snapshot
+
+    assert [ohlcv(b) for b in snapshot("AAPL", "1m", 10)] == [
+        (0, 10, 12, 10, 12, 3),
+        (60, 9, 9, 9, 9, 3),
+        (240, 11, 11, 11, 11, 4),
+        (300, 15, 15, 15, 15, 5),
+        (3600, 20, 20, 20, 20, 6),
+    ]
+    assert [ohlcv(b) for b in snapshot("AAPL", "5m", 10)] == [
+        (0, 10, 12, 9, 11, 10),
+        (300, 15, 15, 15, 15, 5),
+        (3600, 20, 20, 20, 20, 6),
+    ]
+    assert [ohlcv(b) for b in snapshot("AAPL", "1h", 10)] == [
+        (0, 10, 15, 9, 15, 15),
+        (3600, 20, 20, 20, 20, 6),
+    ]
+    # Limit keeps the most recent bars, the in-progress one last
+    assert [ohlcv(b)[0] for b in snapshot("AAPL", "1m", 2)] == [300, 3600]
+
+
+def test_late_updates_are_ignored():
+    agg = BarAggregator()
+    agg.add(PriceUpdate.tick("AAPL", T0 + 120, 10, 1))
+    events = agg.add(PriceUpdate.tick("AAPL", T0 + 30, 99, 1))
+
+    # Too old for the current 1m bar, still inside the 5m and 1h ones
+    assert [ev[1] for ev in events] == ["5m", "1h"]
+    assert [ohlcv(b) for b in agg.snapshot("AAPL", "1m", 10)] == [(120, 10, 10, 10, 10, 1)]
+
+
+def test_ring_wraps_around():
+    ring = BarRing(3)
+    for i in range(5):
+        ring.append([T0 + 60 * i, i, i, i, i, i])
+
+    assert len(ring) == 3
+    assert [b["close"] for b in ring.last()] == [2, 3, 4]
+    assert [b["close"] for b in ring.last(2)] == [3, 4]
+    assert ring.last(0) == []
+
+
+def test_aggregator_ring_keeps_most_recent_closed_bars(tmp_path):
+    hub = StreamHub(BarAggregator(ring_size=2))
+    asyncio.run(replay_into(hub, write_replay(tmp_path / "ticks.csv")))
+
+    # 4 closed 1m bars went through a ring of 2, plus the in-progress bar
+    assert [ohlcv(b)[0] for b in hub.aggregator.snapshot("AAPL", "1m", 10)] == [240, 300, 3600]
+
+
+def test_slow_subscriber_drops_its_oldest_messages_only(tmp_path):
+    path = write_replay(tmp_path / "ticks.csv")
+    hub = StreamHub(BarAggregator(), queue_size=2)
+    received = []
+
+    async def scenario():
+        slow = hub.subscribe([("AAPL", "1m")])
+        fast = hub.subscribe([("AAPL", "1m")])
+
+        async def drain():
+            while True:
+                received.append(await fast.get())
+
+        consumer = asyncio.create_task(drain())
+        await replay_into(hub, path)
+        await asyncio.sleep(0)
+        consumer.cancel()
+        return [slow.get_nowait() for _ in range(slow.qsize())]
+
+    slow_messages = asyncio.run(scenario())
+
+    # 6 in-progress updates + 4 closed bars
+    assert len(received) == 10
+    # The slow subscriber kept only the newest two, the same string objects
+    assert len(slow_messages) == 2
+    assert slow_messages[0] is received[-2] and slow_messages[1] is received[-1]
+    last = json.loads(slow_messages[-1])
+    assert (last["ticker"], last["interval"], last["closed"]) == ("AAPL", "1m", False)
+    assert ohlcv(last["bar"]) == (3600, 20, 20, 20, 20, 6)
+
+
+def test_unsubscribed_queue_gets_nothing(tmp_path):
+    hub = StreamHub(BarAggregator())
+
+    async def scenario():
+        queue = hub.subscribe([("AAPL", "1m")])
+        other = hub.subscribe([("MSFT", "1m")])
+        hub.unsubscribe(queue)
+        await replay_into(hub, write_replay(tmp_path / "ticks.csv"))
+        return queue.qsize(), other.qsize(), hub.subscriber_count()
+
+    assert asyncio.run(scenario()) == (0, 0, 1)
+
+
+def test_looping_replay_starts_new_bars_each_pass(tmp_path):
+    path = write_replay(tmp_path / "ticks.csv")
+    agg = BarAggregator()
+
+    async def scenario(passes):
+        n = 0
+        async for update in ReplayFileSource(path, speed=1e9, loop=True).updates():
+            agg.add(update)
+            n += 1
+            if n == passes * len(TICKS):
+                return
+
+    asyncio.run(scenario(3))
+    bars = agg.snapshot("AAPL", "1h", 10)
+    # Each pass produces two 1h bars in later hours, with unchanged volumes
+    assert [b["volume"] for b in bars] == [15, 6] * 3
+    assert all(a["ts"] < b["ts"] for a, b in zip(bars, bars[1:]))
+
+
+def test_looping_replay_needs_positive_speed(tmp_path):
+    with pytest.raises(ValueError):
+        ReplayFileSource(write_replay(tmp_path / "ticks.csv"), speed=0, loop=True)
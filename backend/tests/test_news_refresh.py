@@ -0,0 +1,115 @@
+"""
+News refresh against a stubbed NewsAPI: backwards paging and the overlap
+window behind the watermark.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.main as main
+from app.article_store import ArticleStore
+
+
+T0 = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def raw_article(i, published):
+    return {
+        "title": f"Apple stock moves {i}",
+        "description": "Apple shares traded higher.",
+        "source": {"name": "Reuters"},
+        "url": f"https://reuters.com/apple-{i}",
+        "publishedAt": iso(published),
+    }
+
+
+class FakeNewsAPI:
+    """Serves `articles` newest first, filtered by from/to like NewsAPI."""
+
+    def __init__(self, articles):
+        self.articles = sorted(articles, key=lambda a: a["publishedAt"], reverse=True)
+        self.calls = []
+
+    def __call__(self, company, page_size, since=None, until=None):
+        self.calls.append((since, until))
+        selected = [
+            a
+            for a in self.articles
+            if (since is None or a["publishedAt"] >= since) and (until is None or a["publishedAt"] <= until)
+        ]
+        return selected[:page_size]
+
+
+@pytest.fixture
+def news_api(monkeypatch):
+    def install(articles):
+        api = FakeNewsAPI(articles)
+        monkeypatch.setattr(main, "fetch_news_articles", api)
+        return api
+
+    return install
+
+
+def test_fetch_since_pages_back_to_since(news_api):
+    # 250 articles, one per minute: three pages of 100
+    api = news_api([raw_article(i, T0 - timedelta(minutes=i)) for i in range(250)])
+
+    articles = main._fetch_since("Apple", iso(T0 - timedelta(minutes=249)))
+
+    assert len(api.calls) == 3
+    assert {a["url"] for a in articles} == {a["url"] for a in api.articles}
+    # Each page ends where the previous one's oldest article was
+    assert api.calls[1][1] == api.articles[99]["publishedAt"]
+
+
+def test_fetch_since_cold_store_takes_one_page(news_api):
+    api = news_api([raw_article(i, T0 - timedelta(minutes=i)) for i in range(250)])
+
+    assert len(main._fetch_since("Apple", None)) == main.NEWS_FETCH_PAGE_SIZE
+    assert len(api.calls) == 1
+
+
+def test_fetch_since_stops_when_oldest_does_not_move(news_api):
+    # More than a page of articles in the same second: `to` cannot advance
+    api = news_api([raw_article(i, T0) for i in range(150)])
+
+    main._fetch_since("Apple", iso(T0 - timedelta(hours=1)))
+
+    assert len(api.calls) == 2
+    assert api.calls[1][1] == iso(T0)
+
+
+def test_fetch_since_stops_at_page_cap(news_api, monkeypatch):
+    monkeypatch.setattr(main, "NEWS_MAX_FETCH_PAGES", 2)
+    api = news_api([raw_article(i, T0 - timedelta(minutes=i)) for i in range(500)])
+
+    assert len(main._fetch_since("Apple", iso(T0 - timedelta(days=1)))) == 200
+    assert len(api.calls) == 2
+
+
+def test_refresh_picks_up_late_indexed_articles(news_api, monkeypatch):
+    store = ArticleStore(":memory:")
+    monkeypatch.setattr(main, "get_article_store", lambda: store)
+    api = news_api([raw_article(1, T0)])
+
+    assert main.refresh_news("AAPL") == 1
+    assert store.fetch_state("AAPL")[0] == iso(T0)
+
+    # Published before the watermark, but only indexed now
+    api.articles.append(raw_article(2, T0 - timedelta(hours=1)))
+    assert main.refresh_news("AAPL") == 1
+
+    since = api.calls[-1][0]
+    assert since == iso(T0 - timedelta(seconds=main.NEWS_FETCH_OVERLAP_SECONDS))
+    assert [a["url"] for a in store.query("AAPL")[0]] == [
+        "https://reuters.com/apple-1",
+        "https://reuters.com/apple-2",
+    ]